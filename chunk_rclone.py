@@ -21,25 +21,64 @@
 #     python3 chunk_rclone.py path/to/your_job_control_file.toml [--dry-run]
 #
 
-import argparse
+import os
 import sys
-from pathlib import Path 
-
-try:
-    from modules.config_handler import load_effective_config, BASE_CONFIG_FILENAME, DEFAULT_CONTROL_FILENAME
-    from modules.rclone_exec import run_rclone_chunk
-except ImportError as e:
-    current_dir = Path.cwd()
-    modules_dir = current_dir / "modules"
-    print(f"ERROR: Could not import necessary modules. Details: {e}", file=sys.stderr)
-    print(f"       Please ensure that the 'modules' directory (expected at '{modules_dir}')", file=sys.stderr)
-    print(f"       exists alongside '{Path(__file__).name}' and contains '__init__.py',", file=sys.stderr)
-    print(f"       'config_handler.py', and 'rclone_exec.py'.", file=sys.stderr)
-    print(f"       You may need to run this script from the project's root directory.", file=sys.stderr)
-    sys.exit(1)
-except Exception as e_import: 
-    print(f"ERROR: An unexpected error occurred during module import: {e_import}", file=sys.stderr)
-    sys.exit(1)
+import time
+import traceback
+
+USAGE = "usage: chunk_rclone.py [-h] [--dry-run] [control_file]"
+
+HELP_TEXT = f"""{USAGE}
+
+Orchestrates chunked rclone copy operations using TOML configuration file(s).
+
+positional arguments:
+  control_file  Optional: Path to a specific .toml control file for this run. If not
+                provided, uses 'config.toml' and then 'control.toml' (if it exists)
+                to override base settings.
+
+options:
+  -h, --help    show this help message and exit
+  --dry-run     Perform a dry run with rclone (adds --dry-run flag to rclone command and
+                appends '_DRYRUN' to local log filenames).
+
+To resume an incomplete operation or run the next chunk, simply re-run the exact same command."""
+
+def parse_args(argv: list) -> tuple:
+    """
+    Parses the command line: an optional control file path and an optional '--dry-run'.
+
+    This tiny grammar is handled directly rather than through argparse, which is
+    comparatively expensive to import and set up for a script that is re-run often.
+
+    Args:
+        argv (list): Command-line arguments, without the program name.
+
+    Returns:
+        tuple: (control_file (str or None), dry_run (bool)).
+
+    Raises:
+        SystemExit: After printing help (code 0) or a usage error (code 2), like argparse.
+    """
+    if "-h" in argv or "--help" in argv:
+        print(HELP_TEXT)
+        sys.exit(0)
+
+    dry_run = False
+    positional_args = []
+    for arg in argv:
+        if arg == "--dry-run":
+            dry_run = True
+        elif arg.startswith("-") and arg != "-":
+            print(f"{USAGE}\nchunk_rclone.py: error: unrecognized arguments: {arg}", file=sys.stderr)
+            sys.exit(2)
+        else:
+            positional_args.append(arg)
+
+    if len(positional_args) > 1:
+        print(f"{USAGE}\nchunk_rclone.py: error: unrecognized arguments: {' '.join(positional_args[1:])}", file=sys.stderr)
+        sys.exit(2)
+    return (positional_args[0] if positional_args else None), dry_run
 
 def main():
     """
@@ -47,47 +86,85 @@ def main():
     and orchestrate the chunked rclone copy operation.
     """
     
-    parser = argparse.ArgumentParser(
-        description="Orchestrates chunked rclone copy operations using TOML configuration file(s).",
-        epilog="To resume an incomplete operation or run the next chunk, simply re-run the exact same command."
-    )
-    parser.add_argument(
-        "control_file",
-        type=str,
-        nargs='?',       
-        default=None,    
-        help=(f"Optional: Path to a specific .toml control file for this run. "
-              f"If not provided, uses '{BASE_CONFIG_FILENAME}' and then "
-              f"'{DEFAULT_CONTROL_FILENAME}' (if it exists) to override base settings.")
-    )
-    parser.add_argument(
-        "--dry-run",
-        action="store_true", 
-        help="Perform a dry run with rclone (adds --dry-run flag to rclone command "
-             "and appends '_DRYRUN' to local log filenames)."
-    )
-    args = parser.parse_args()
-
-    print(f"--- Starting Chunked Rclone Copy Orchestrator (using Python) ---")
-    if args.dry_run:
-        print("INFO: *** DRY RUN MODE ENABLED *** Rclone will simulate operations.")
+    control_file_arg, dry_run = parse_args(sys.argv[1:])
+
+    sys.stdout.write("--- Starting Chunked Rclone Copy Orchestrator (using Python) ---\n"
+                     + ("INFO: *** DRY RUN MODE ENABLED *** Rclone will simulate operations.\n" if dry_run else ""))
 
+    # An unchanged exec_rclone job is exec'd straight from its saved command line,
+    # without loading the configuration (this call only returns if that isn't possible).
     try:
-        effective_configuration = load_effective_config(args.control_file)
-        effective_configuration['is_dry_run'] = args.dry_run # Pass dry_run status
-        
-        run_status = run_rclone_chunk(effective_configuration)
+        from modules import exec_cache
+        exec_cache.exec_cached_command(control_file_arg, dry_run)
+    except ImportError:
+        pass # Reported by the imports below
+
+    # Imported only now, so '--help' and usage errors don't pay for loading them.
+    try:
+        from modules.config_handler import load_effective_config
+        from modules.rclone_exec import run_rclone_chunk, stop_rc_daemon, wait_for_log_uploads
+    except ImportError as e:
+        modules_dir = os.path.join(os.getcwd(), "modules")
+        sys.stderr.write("\n".join((
+            f"ERROR: Could not import necessary modules. Details: {e}",
+            f"       Please ensure that the 'modules' directory (expected at '{modules_dir}')",
+            f"       exists alongside '{os.path.basename(__file__)}' and contains '__init__.py',",
+            f"       'config_handler.py', and 'rclone_exec.py'.",
+            f"       You may need to run this script from the project's root directory.",
+        )) + "\n")
+        sys.exit(1)
+    except Exception as e_import: 
+        print(f"ERROR: An unexpected error occurred during module import: {e_import}", file=sys.stderr)
+        sys.exit(1)
+
+    try:
+        start_time = time.monotonic()
+        while True:
+            # (Re)load the configuration for every chunk, so edits to the control file
+            # take effect at the next chunk boundary in continuous mode.
+            effective_configuration = load_effective_config(control_file_arg)
+            effective_configuration.is_dry_run = dry_run # Pass dry_run status
+            
+            chunk_result = run_rclone_chunk(effective_configuration)
+            run_status = int(chunk_result)
+
+            # In continuous mode, keep running chunks in this process (instead of being
+            # re-run from outside) until the job is complete, fails, is interrupted,
+            # or the total time budget is used up.
+            if not effective_configuration.continuous or run_status != 0:
+                break
+            if chunk_result.job_complete:
+                print("\n--- Continuous mode: all work is done. ---")
+                break
+            if chunk_result.rclone_exit == 130:
+                break
+            if dry_run:
+                print("\n--- Continuous mode: stopping after one chunk in dry run mode. ---")
+                break
+            total_budget_seconds = effective_configuration.total_budget_seconds
+            if total_budget_seconds and time.monotonic() - start_time >= total_budget_seconds:
+                print(f"\n--- Continuous mode: total budget of {total_budget_seconds} seconds used up. ---")
+                break
+            print("\n--- Continuous mode: starting the next chunk. ---")
+
+        # Log uploads run in the background while the next chunk starts; let them finish.
+        wait_for_log_uploads()
+        # The job's rc daemon is not needed any more once all of its work is done.
+        if effective_configuration.use_rcd and chunk_result.job_complete:
+            stop_rc_daemon(effective_configuration)
         
+        # Closing messages, assembled first and written with a single call
         if run_status == 0: 
-            print("\n--- Chunk processing cycle finished as expected. ---")
-            if effective_configuration.get('is_dry_run'):
-                 print("--- (Dry run mode was active) ---")
-            print("--- To continue copying remaining files (if any), "
-                  "simply re-run this Python script with the same command/control setup. ---")
+            closing_lines = ["\n--- Chunk processing cycle finished as expected. ---"]
+            if effective_configuration.is_dry_run:
+                closing_lines.append("--- (Dry run mode was active) ---")
+            closing_lines.append("--- To continue copying remaining files (if any), "
+                                 "simply re-run this Python script with the same command/control setup. ---")
         else: 
-            print(f"\n--- Rclone (or script setup) reported an error (exit code: {run_status}). ---")
-            print("--- Please check the rclone log file and console output for details. ---")
-            print("--- You may still be able to re-run this script to retry after addressing issues. ---")
+            closing_lines = [f"\n--- Rclone (or script setup) reported an error (exit code: {run_status}). ---",
+                             "--- Please check the rclone log file and console output for details. ---",
+                             "--- You may still be able to re-run this script to retry after addressing issues. ---"]
+        sys.stdout.write("\n".join(closing_lines) + "\n")
         
         sys.exit(run_status) 
 
@@ -98,8 +175,9 @@ def main():
             print(f"--- Script execution failed with exit code: {e.code}. ---")
         sys.exit(e.code if e.code is not None else 1) 
     except Exception as e:
-        print(f"\nCRITICAL ERROR: An unexpected error occurred in the main script: {e}", file=sys.stderr)
-        print("--- Please review the error message and stack trace if available. ---", file=sys.stderr)
+        sys.stderr.write(f"\nCRITICAL ERROR: An unexpected error occurred in the main script: {e}\n")
+        traceback.print_exc()
+        sys.stderr.write("--- Please review the error message and stack trace above. ---\n")
         sys.exit(1) 
 
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+# modules/common.py
+"""
+Small helpers shared by the chunk_rclone modules.
+
+- ensure_dir(): creates a directory once per process.
+- config_files_signature(): modification times/sizes of the configuration files
+  a job's settings come from, so cached data can tell when they changed.
+- code_fingerprint(): identifies the installed version of this package, so
+  cached data written by another version is not reused.
+- next_log_sequence(): the job's chunk counter, used to name log files.
+
+Only lightweight standard library modules are imported here, since this module is
+loaded on every run (through modules/exec_cache.py) before anything else.
+"""
+
+import os
+import sys
+try:
+    import fcntl # POSIX only; used to serialize updates of the log sequence counter
+except ImportError:
+    fcntl = None
+
+LOG_SEQ_FILENAME = "seq"
+
+# Bump when the format of cached data changes in a way code_fingerprint() would not catch.
+CACHE_VERSION = 1
+_code_fingerprint = None
+
+def code_fingerprint() -> list:
+    """
+    Returns [CACHE_VERSION, [file name, mtime_ns, size] for each .py file of this
+    package], computed once per process. Cached settings and saved commands include
+    it, so installing a different version of the code invalidates them.
+    """
+    global _code_fingerprint
+    if _code_fingerprint is None:
+        package_dir = os.path.dirname(os.path.abspath(__file__))
+        file_signatures = []
+        with os.scandir(package_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith(".py"):
+                    st = entry.stat()
+                    file_signatures.append([entry.name, st.st_mtime_ns, st.st_size])
+        _code_fingerprint = [CACHE_VERSION, sorted(file_signatures)]
+    return _code_fingerprint
+
+# Directories already created (or found) by ensure_dir() in this process.
+_created_dirs = set()
+
+def ensure_dir(path) -> None:
+    """
+    os.makedirs(path, exist_ok=True), skipped for a path this process has already
+    created, so chunks run back to back do not repeat the mkdir system calls.
+
+    Raises:
+        OSError: If the directory cannot be created.
+    """
+    path = os.fspath(path)
+    if path not in _created_dirs:
+        os.makedirs(path, exist_ok=True)
+        _created_dirs.add(path)
+
+def config_files_signature(current_working_dir: str, control_file_arg: str = None,
+                           base_config_filename: str = "config.toml",
+                           default_control_filename: str = "control.toml") -> list:
+    """
+    Returns [path, [mtime_ns, size] or None] for the base config file and for every
+    path a control file could be loaded from, so that any edit, creation or removal
+    of one of them changes the signature.
+    """
+    if control_file_arg:
+        candidate_paths = [control_file_arg, os.path.join(current_working_dir, control_file_arg)]
+    else:
+        candidate_paths = [os.path.join(current_working_dir, default_control_filename)]
+    signature = []
+    for path in [os.path.join(current_working_dir, base_config_filename), *candidate_paths]:
+        try:
+            st = os.stat(path)
+            signature.append([path, [st.st_mtime_ns, st.st_size]])
+        except OSError:
+            signature.append([path, None])
+    return signature
+
+def next_log_sequence(state_dir: str):
+    """
+    Atomically increments and returns the job's chunk counter in '<state_dir>/seq'
+    (starting at 1), so log files of chunks started within the same second get
+    distinct names. Returns None if the counter cannot be read or written.
+    """
+    try:
+        ensure_dir(state_dir)
+        seq_fd = os.open(os.path.join(state_dir, LOG_SEQ_FILENAME), os.O_CREAT | os.O_RDWR, 0o644)
+    except OSError as e:
+        print(f"WARNING: Could not open the log sequence counter in '{state_dir}': {e}", file=sys.stderr)
+        return None
+    try:
+        if fcntl:
+            fcntl.flock(seq_fd, fcntl.LOCK_EX) # Released when seq_fd is closed
+        seq = int(os.read(seq_fd, 32).strip() or 0) + 1
+        os.lseek(seq_fd, 0, os.SEEK_SET)
+        os.ftruncate(seq_fd, 0)
+        os.write(seq_fd, f"{seq}\n".encode('ascii'))
+        return seq
+    except (OSError, ValueError) as e:
+        print(f"WARNING: Could not update the log sequence counter in '{state_dir}': {e}", file=sys.stderr)
+        return None
+    finally:
+        os.close(seq_fd)
+
+# end of modules/common.py
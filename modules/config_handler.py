@@ -9,15 +9,239 @@ Handles loading and merging of TOML configuration files for the chunk_rclone uti
   final effective configuration.
 """
 
-import tomllib # Using built-in tomllib for Python 3.11+
+# Prefer a native TOML parser if one is installed (much faster than the pure-Python
+# tomllib), then the built-in tomllib (Python 3.11+), then 'tomli' for older Pythons.
+# All of them parse a str; TOML_DECODE_ERRORS are the parser's errors.
+try:
+    import rtoml as _toml_parser
+    TOML_DECODE_ERRORS = (getattr(_toml_parser, 'TomlParsingError', ValueError),)
+except ImportError:
+    try:
+        import pytomlpp as _toml_parser
+        TOML_DECODE_ERRORS = (getattr(_toml_parser, 'DecodeError', ValueError),)
+    except ImportError:
+        try:
+            import tomllib as _toml_parser # Using built-in tomllib for Python 3.11+
+        except ImportError:
+            import tomli as _toml_parser # Same API and TOMLDecodeError; see requirements.txt for Python < 3.11
+        TOML_DECODE_ERRORS = (_toml_parser.TOMLDecodeError,)
+_toml_loads = _toml_parser.loads
+import copy
+import dataclasses
+import functools
+from collections import ChainMap
+import hashlib
+import marshal
+import os
 import sys
 from pathlib import Path
+from typing import Optional
+
+from . import common
 
 # Constants for default configuration file names, relative to script execution dir
 BASE_CONFIG_FILENAME = "config.toml"
 DEFAULT_CONTROL_FILENAME = "control.toml"
 
-def load_effective_config(control_file_arg: str = None) -> dict:
+# Validated settings are cached here so that repeated chunk runs can skip parsing,
+# merging and validating configuration files that have not changed since the last run.
+# Set RCLONE_CHUNK_NOCACHE=1 in the environment to bypass this cache.
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "chunk_rclone"
+
+def _settings_cache_path(memo_key: tuple) -> Path:
+    """
+    Returns the cache file for settings loaded with memo_key. There is one file per
+    job, overwritten whenever its settings are cached again, so the cache does not
+    grow as the configuration files or the code change.
+    """
+    digest = hashlib.blake2b(repr(memo_key).encode('utf-8'), digest_size=16).hexdigest()
+    return CACHE_DIR / f"settings_{digest}.marshal"
+
+def _settings_cache_check(files_signature: list) -> list:
+    """
+    Returns what a cached entry must have been saved with to be reused: the files'
+    signature, the settings schema and the code's fingerprint, so settings cached
+    from other files or by another version are never returned.
+    """
+    return [files_signature, _SCHEMA_FINGERPRINT, common.code_fingerprint()]
+
+def _read_cached_settings(cache_path: Path, cache_check: list):
+    """Returns the EffectiveConfig cached at cache_path, or None if there is no usable entry for cache_check."""
+    try:
+        with open(cache_path, 'rb') as f:
+            entry = marshal.load(f)
+        if entry['check'] != cache_check:
+            return None
+        return EffectiveConfig(**entry['settings'])
+    except (OSError, EOFError, ValueError, TypeError, KeyError):
+        return None # Missing, unreadable or outdated cache entry; load the files instead.
+
+def _write_cached_settings(cache_path: Path, cache_check: list, final_settings) -> None:
+    """
+    Caches final_settings (an EffectiveConfig) at cache_path, together with cache_check.
+    The cache is written with 'marshal' as a plain dict (settings are plain
+    lists/strings/ints); caching is best-effort only.
+    """
+    try:
+        payload = marshal.dumps({'check': cache_check, 'settings': dataclasses.asdict(final_settings)})
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, cache_path)
+    except (OSError, ValueError):
+        pass
+
+@dataclasses.dataclass(**({'slots': True} if sys.version_info >= (3, 10) else {}))
+class EffectiveConfig:
+    """
+    The validated settings for one job, as returned by load_effective_config().
+
+    Settings are plain attributes (slots on Python 3.10+). For older callers the
+    object also supports cfg['key'], cfg['key'] = value and cfg.get('key', default).
+    """
+    remote_name: str
+    source_rclone_path_on_remote: str
+    dest_parent_rclone_path_on_remote: str
+    backup_folder_name: str
+    run_duration_seconds: int
+    state_dir: str
+    run_description: str = "Chunked Rclone Run"
+    rclone_flags: list = dataclasses.field(default_factory=list)
+    use_rcd: bool = False
+    rcd_addr: Optional[str] = None
+    rclone_tuning_auto: bool = False
+    rclone_tuning_backend_flags: bool = False
+    exec_rclone: bool = False
+    continuous: bool = False
+    total_budget_seconds: int = 0
+    grace_seconds: int = 30
+    files_from_batch_size: int = 0
+    parallel_workers: int = 1
+    log_dir: str = 'rclone_chunk_logs_py'
+    log_file_basename: str = 'rclone_copy_chunk'
+    upload_logs_to_remote: bool = False
+    remote_log_upload_path: Optional[str] = None
+    json_log: bool = False
+    show_command: bool = True
+    compress_log_uploads: bool = False
+    # 'remote:path' arguments for rclone, built once when the settings are loaded
+    full_source_rclone_path: Optional[str] = None
+    full_destination_rclone_path: Optional[str] = None
+    # Which configuration files these settings came from (see modules/common.py)
+    control_file_arg: Optional[str] = None
+    config_files_signature: Optional[list] = None
+    # Run state, set by chunk_rclone.py
+    is_dry_run: bool = False
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key: str, value) -> None:
+        if key not in self.__dataclass_fields__:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+# How each final setting is read from the merged configuration:
+# (final key, section (None = top level), key within the section,
+#  minimum value for integer settings (None = not validated), requirement shown on error).
+# Defaults come from EffectiveConfig, so they are defined in one place only.
+_SETTINGS_SOURCES = (
+    ('run_description', None, 'run_description', None, None),
+    ('remote_name', 'rclone_paths', 'remote_name', None, None),
+    ('source_rclone_path_on_remote', 'rclone_paths', 'source_path', None, None),
+    ('dest_parent_rclone_path_on_remote', 'rclone_paths', 'destination_parent_path', None, None),
+    ('backup_folder_name', 'rclone_paths', 'backup_folder_name', None, None),
+    ('rclone_flags', 'rclone_options', 'flags', None, None), # Defaults to a new empty list
+    ('use_rcd', 'rclone_rc', 'use_rcd', None, None),
+    ('rcd_addr', 'rclone_rc', 'addr', None, None),
+    ('rclone_tuning_auto', 'rclone_tuning', 'auto', None, None),
+    ('rclone_tuning_backend_flags', 'rclone_tuning', 'backend_flags', None, None),
+    ('run_duration_seconds', 'chunking', 'run_duration_seconds', 1,
+     "Must be a positive integer defined in the effective config's [chunking] section."),
+    ('exec_rclone', 'chunking', 'exec_rclone', None, None),
+    ('continuous', 'chunking', 'continuous', None, None),
+    ('total_budget_seconds', 'chunking', 'total_budget_seconds', 0, "Must be a non-negative integer (0 means no limit)."),
+    ('grace_seconds', 'chunking', 'grace_seconds', 0, "Must be a non-negative integer."),
+    ('state_dir', 'chunking', 'state_dir', None, None), # Defaults to rclone_chunk_state/<backup_folder_name>
+    ('files_from_batch_size', 'chunking', 'files_from_batch_size', 0, "Must be a non-negative integer (0 disables batching)."),
+    ('parallel_workers', 'chunking', 'parallel_workers', 1, "Must be a positive integer."),
+    ('log_dir', 'logging', 'log_dir', None, None),
+    ('log_file_basename', 'logging', 'log_file_basename', None, None),
+    ('upload_logs_to_remote', 'logging', 'upload_logs_to_remote', None, None),
+    ('remote_log_upload_path', 'logging', 'remote_log_upload_path', None, None),
+    ('json_log', 'logging', 'json_log', None, None),
+    ('show_command', 'logging', 'show_command', None, None),
+    ('compress_log_uploads', 'logging', 'compress_log_uploads', None, None),
+)
+
+def _field_default(final_key: str):
+    """Returns EffectiveConfig's default for final_key, or None if the setting has no plain default."""
+    default = EffectiveConfig.__dataclass_fields__[final_key].default
+    return None if default is dataclasses.MISSING else default
+
+# The same rows with each setting's default inserted after its key:
+# (final key, section, key, default, minimum, requirement)
+_SETTINGS_SCHEMA = tuple((final_key, section, key, _field_default(final_key), minimum, requirement)
+                         for final_key, section, key, minimum, requirement in _SETTINGS_SOURCES)
+_SETTINGS_SECTIONS = {row[1] for row in _SETTINGS_SCHEMA if row[1]}
+# Identifies the settings' shape and defaults in cached entries (see _settings_cache_check())
+# (only stable values: the repr of dataclasses.MISSING would differ from run to run)
+_SCHEMA_FINGERPRINT = repr((_SETTINGS_SCHEMA, [(field.name, _field_default(field.name), getattr(field.default_factory, '__name__', None))
+                                               for field in dataclasses.fields(EffectiveConfig)]))
+# (final key, key, default, minimum, requirement) of the integer settings that are validated
+_INT_SETTINGS = tuple((row[0], row[2], row[3], row[4], row[5]) for row in _SETTINGS_SCHEMA if row[4] is not None)
+
+def join_remote_path(parent: str, name: str) -> str:
+    """Joins two rclone remote path components with '/' (an empty parent means the remote root)."""
+    return f"{parent.rstrip('/')}/{name}" if parent else name
+
+@functools.lru_cache(maxsize=None)
+def _config_paths() -> tuple:
+    """
+    Returns (working directory, base config path, default control file path), computed
+    once per process: the script never changes directory, so repeated loads (one per
+    chunk in continuous mode) reuse them.
+    """
+    current_working_dir = Path.cwd()
+    return current_working_dir, current_working_dir / BASE_CONFIG_FILENAME, current_working_dir / DEFAULT_CONTROL_FILENAME
+
+def _resolve_and_read(path_arg: str, current_working_dir: Path):
+    """
+    Reads a control file given as path_arg, trying it as given first and then (if it
+    is relative) relative to current_working_dir, with one read attempt per location
+    instead of separate existence checks. The file is decoded as UTF-8 here, once.
+
+    Returns:
+        tuple: (Path, str) of the file that was read, or None if neither exists.
+
+    Raises:
+        OSError: If a file exists but cannot be read (e.g., permission denied).
+        UnicodeDecodeError: If the file is not valid UTF-8.
+    """
+    candidate_paths = [Path(path_arg)]
+    if not candidate_paths[0].is_absolute():
+        candidate_paths.append(current_working_dir / path_arg)
+    for candidate_path in candidate_paths:
+        try:
+            return candidate_path, candidate_path.read_bytes().decode('utf-8')
+        except (FileNotFoundError, IsADirectoryError):
+            continue
+    return None
+
+# INFO messages about which configuration files were loaded; RCLONE_CHUNK_VERBOSE=0 turns them off.
+_VERBOSE = os.environ.get('RCLONE_CHUNK_VERBOSE', '1') != '0'
+
+# Validated settings from earlier calls in this process (continuous mode reloads the
+# configuration before every chunk), keyed by working directory and control file argument.
+_validated_config_memo = {}
+
+def load_effective_config(control_file_arg: str = None, base_source=None, control_source=None) -> EffectiveConfig:
     """
     Loads base configuration and an optional control configuration, merging them.
 
@@ -28,178 +252,221 @@ def load_effective_config(control_file_arg: str = None) -> dict:
     Settings from the control file override/merge with corresponding settings 
     in the base config.
 
+    Either document can instead be passed in directly as TOML text (base_source,
+    control_source), e.g. by tests or when embedding the utility; that document is
+    then not looked up on disk at all.
+
+    The validated result is remembered, within this process and on disk (see
+    CACHE_DIR), and returned again (as a fresh copy) for as long as none of the
+    configuration files has changed (not for documents passed in directly).
+
+    INFO messages are collected and written to stdout in one go once loading has
+    finished (or failed); set RCLONE_CHUNK_VERBOSE=0 to suppress them.
+
     Args:
         control_file_arg (str, optional): Path to a specific control file
                                           passed via command line.
+        base_source (str or bytes, optional): TOML document to use instead of BASE_CONFIG_FILENAME.
+        control_source (str or bytes, optional): TOML document to use as the control file
+                                                 (control_file_arg is then ignored).
 
     Returns:
-        dict: The final, effective configuration dictionary.
+        EffectiveConfig: The final, validated settings for the job.
 
     Raises:
         SystemExit: If critical configurations are missing or files cannot be loaded/parsed.
     """
+    info_lines = []
+    try:
+        return _load_effective_config(control_file_arg, info_lines, base_source, control_source)
+    finally:
+        if info_lines:
+            sys.stdout.write("\n".join(info_lines) + "\n")
+
+def _fail(info_lines: list, message: str):
+    """
+    Writes the INFO messages collected so far (so they appear before the error, in
+    the order things happened), then message to stderr, and exits with code 1.
+    """
+    if info_lines:
+        sys.stdout.write("\n".join(info_lines) + "\n")
+        sys.stdout.flush()
+        info_lines.clear()
+    sys.stderr.write(message + "\n")
+    sys.exit(1)
+
+def _load_effective_config(control_file_arg: str, info_lines: list, base_source=None, control_source=None) -> EffectiveConfig:
+    """Does the work of load_effective_config(), appending INFO messages to info_lines."""
     effective_config = {}
     # Assume config files are in the current working directory from where main script is launched
-    current_working_dir = Path.cwd() 
+    current_working_dir, base_config_path, default_control_path = _config_paths()
+    if isinstance(base_source, bytes):
+        base_source = base_source.decode('utf-8')
+    if isinstance(control_source, bytes):
+        control_source = control_source.decode('utf-8')
+    # Settings built from documents passed in directly are neither cached nor looked up in a cache.
+    from_files_only = base_source is None and control_source is None
+
+    memo_key = (str(current_working_dir), control_file_arg)
+    files_signature = None
+    if from_files_only:
+        files_signature = common.config_files_signature(str(current_working_dir), control_file_arg,
+                                                        BASE_CONFIG_FILENAME, DEFAULT_CONTROL_FILENAME)
+    memo_entry = _validated_config_memo.get(memo_key) if from_files_only else None
+    if memo_entry and memo_entry[0] == files_signature:
+        if _VERBOSE:
+            info_lines.append("INFO: Configuration files unchanged; reusing the validated settings.")
+        return copy.deepcopy(memo_entry[1])
+
+    use_disk_cache = from_files_only and os.environ.get("RCLONE_CHUNK_NOCACHE") != "1"
+    settings_cache_path = settings_cache_check = None
+    if use_disk_cache:
+        # Only computed here: the check stats the code's files (see common.code_fingerprint()).
+        settings_cache_path = _settings_cache_path(memo_key)
+        settings_cache_check = _settings_cache_check(files_signature)
+        cached_settings = _read_cached_settings(settings_cache_path, settings_cache_check)
+        if cached_settings is not None:
+            if _VERBOSE:
+                info_lines.append("INFO: Configuration files unchanged since the last run; using cached settings.")
+            _validated_config_memo[memo_key] = (files_signature, copy.deepcopy(cached_settings))
+            return cached_settings
 
     # 1. Load BASE_CONFIG_FILE (mandatory)
-    base_config_path = current_working_dir / BASE_CONFIG_FILENAME
+    base_config_label = "<base_source>" if base_source is not None else os.fspath(base_config_path)
     try:
-        if not base_config_path.is_file():
-            print(f"ERROR: Base configuration file '{BASE_CONFIG_FILENAME}' not found in '{current_working_dir}'.", file=sys.stderr)
-            sys.exit(1)
-        with open(base_config_path, 'rb') as f: # tomllib needs binary mode
-            effective_config = tomllib.load(f) # Start with base config
-        print(f"INFO: Loaded base configuration from '{base_config_path.resolve()}'")
-    except tomllib.TOMLDecodeError as e:
-        print(f"ERROR: Could not parse base config '{BASE_CONFIG_FILENAME}': {e}", file=sys.stderr)
-        sys.exit(1)
+        # Read the whole file in one go and parse from memory, rather than letting the parser stream it.
+        # A missing file shows up as the read failing, so no separate is_file() check is needed.
+        # It is decoded exactly once; the parser and any error message both use that text.
+        base_config_text = base_source if base_source is not None else base_config_path.read_bytes().decode('utf-8')
+    except (FileNotFoundError, IsADirectoryError):
+        _fail(info_lines, f"ERROR: Base configuration file '{BASE_CONFIG_FILENAME}' not found in '{current_working_dir}'.")
     except Exception as e:
-        print(f"ERROR: An unexpected error occurred loading base config '{BASE_CONFIG_FILENAME}': {e}", file=sys.stderr)
-        sys.exit(1)
+        _fail(info_lines, f"ERROR: An unexpected error occurred loading base config '{BASE_CONFIG_FILENAME}': {e}")
+    try:
+        effective_config = _toml_loads(base_config_text) # Start with base config
+        if _VERBOSE:
+            info_lines.append(f"INFO: Loaded base configuration from '{base_config_label}'")
+    except TOML_DECODE_ERRORS as e:
+        _fail(info_lines, f"ERROR: Could not parse base config '{BASE_CONFIG_FILENAME}': {e}\n"
+                          f"       File begins with: {base_config_text[:200]!r}")
+    except Exception as e:
+        _fail(info_lines, f"ERROR: An unexpected error occurred loading base config '{BASE_CONFIG_FILENAME}': {e}")
 
     # 2. Determine which control file to load
     control_file_to_load_path_obj = None 
-    if control_file_arg:
-        control_file_to_load_path_obj = Path(control_file_arg) 
-        if not control_file_to_load_path_obj.is_file():
-            if not control_file_to_load_path_obj.is_absolute():
-                control_file_to_load_path_obj = current_working_dir / control_file_arg
-            if not control_file_to_load_path_obj.is_file(): 
-                print(f"ERROR: Specified control file '{control_file_arg}' not found.", file=sys.stderr)
-                sys.exit(1)
-        print(f"INFO: Custom control file specified: '{control_file_to_load_path_obj.resolve()}'")
+    control_file_text = None
+    control_file_label = None
+    control_file_read = None
+    if control_source is None:
+        try:
+            control_file_read = _resolve_and_read(control_file_arg or default_control_path,
+                                                  current_working_dir)
+        except (OSError, UnicodeDecodeError) as e:
+            _fail(info_lines, f"ERROR: An unexpected error occurred loading/merging control file '{control_file_arg or DEFAULT_CONTROL_FILENAME}': {e}")
+    if control_source is not None:
+        control_file_text, control_file_label = control_source, "<control_source>"
+    elif control_file_arg:
+        if control_file_read is None:
+            _fail(info_lines, f"ERROR: Specified control file '{control_file_arg}' not found.")
+        control_file_to_load_path_obj, control_file_text = control_file_read
+        control_file_label = os.fspath(control_file_to_load_path_obj)
+        if _VERBOSE:
+            info_lines.append(f"INFO: Custom control file specified: '{control_file_label}'")
     else:
-        default_control_path = current_working_dir / DEFAULT_CONTROL_FILENAME
-        if default_control_path.is_file():
-            control_file_to_load_path_obj = default_control_path
-            print(f"INFO: Using default control file: '{default_control_path.resolve()}'")
+        if control_file_read is not None:
+            control_file_to_load_path_obj, control_file_text = control_file_read
+            control_file_label = os.fspath(control_file_to_load_path_obj)
+            if _VERBOSE:
+                info_lines.append(f"INFO: Using default control file: '{control_file_label}'")
         else:
-            print(f"INFO: No custom control file specified and default '{DEFAULT_CONTROL_FILENAME}' not found in '{current_working_dir}'.")
-            print(f"INFO: Proceeding with settings from '{BASE_CONFIG_FILENAME}' only.")
+            if _VERBOSE:
+                info_lines.append(f"INFO: No custom control file specified and default '{DEFAULT_CONTROL_FILENAME}' not found in '{current_working_dir}'.")
+                info_lines.append(f"INFO: Proceeding with settings from '{BASE_CONFIG_FILENAME}' only.")
 
     # 3. Load and merge control file if one was identified
-    if control_file_to_load_path_obj:
+    if control_file_text is not None:
         try:
-            with open(control_file_to_load_path_obj, 'rb') as f: # tomllib needs binary mode
-                control_cfg_data = tomllib.load(f)
-            print(f"INFO: Loaded control settings from '{control_file_to_load_path_obj.resolve()}'")
-
-            # Merge/Override logic: Iterate through top-level keys from control file.
-            for key, control_value in control_cfg_data.items():
-                if isinstance(control_value, dict) and isinstance(effective_config.get(key), dict):
-                    # If both base and control have this section as a dictionary, merge them.
-                    # Control's sub-keys override base's sub-keys within this section.
-                    effective_config.setdefault(key, {}).update(control_value)
-                else:
-                    # Otherwise, control's value for the key replaces base's value entirely.
-                    effective_config[key] = control_value
-            print(f"INFO: Settings from '{control_file_to_load_path_obj.resolve()}' have been merged/overridden.")
-
-        except tomllib.TOMLDecodeError as e:
-            print(f"ERROR: Could not parse control file '{control_file_to_load_path_obj}': {e}", file=sys.stderr)
-            sys.exit(1) 
+            control_cfg_data = _toml_loads(control_file_text) if control_file_text.strip() else {}
+            if _VERBOSE:
+                info_lines.append(f"INFO: Loaded control settings from '{control_file_label}'")
+
+            # An empty control file (e.g., only comments) changes nothing; skip the merge.
+            if control_cfg_data:
+                # Merge/Override logic: layer the control file over the base config with ChainMaps,
+                # so nothing is copied. Where both have a section as a dictionary, the section is
+                # layered the same way (control's sub-keys override base's sub-keys within it);
+                # any other control value replaces base's value for that key entirely.
+                # (TOML tables always parse to plain dicts, so an exact type check is enough.)
+                merged_sections = {}
+                for key, control_value in control_cfg_data.items():
+                    if type(control_value) is dict:
+                        base_value = effective_config.get(key)
+                        if type(base_value) is dict:
+                            merged_sections[key] = ChainMap(control_value, base_value)
+                effective_config = ChainMap(merged_sections, control_cfg_data, effective_config)
+                if _VERBOSE:
+                    info_lines.append(f"INFO: Settings from '{control_file_label}' have been merged/overridden.")
+
+        except TOML_DECODE_ERRORS as e:
+            _fail(info_lines, f"ERROR: Could not parse control file '{control_file_label}': {e}\n"
+                              f"       File begins with: {control_file_text[:200]!r}")
         except Exception as e:
-            print(f"ERROR: An unexpected error occurred loading/merging control file '{control_file_to_load_path_obj}': {e}", file=sys.stderr)
-            sys.exit(1)
+            _fail(info_lines, f"ERROR: An unexpected error occurred loading/merging control file '{control_file_label}': {e}")
 
     # --- Extract and Validate final effective settings for the rclone job ---
     final_settings = {}
-    final_settings['run_description'] = effective_config.get('run_description', "Chunked Rclone Run")
-
-    rclone_paths_cfg = effective_config.get('rclone_paths', {})
-    final_settings['remote_name'] = rclone_paths_cfg.get('remote_name')
-    final_settings['source_rclone_path_on_remote'] = rclone_paths_cfg.get('source_path')
-    final_settings['dest_parent_rclone_path_on_remote'] = rclone_paths_cfg.get('destination_parent_path')
-    final_settings['backup_folder_name'] = rclone_paths_cfg.get('backup_folder_name')
+    # Identify the configuration files these settings came from (see modules/common.py).
+    final_settings['control_file_arg'] = control_file_arg
+    final_settings['config_files_signature'] = files_signature
+    sections = {section: effective_config.get(section, {}) for section in _SETTINGS_SECTIONS}
+    sections[None] = effective_config # Top-level keys
+    for final_key, section, key, default, _minimum, _requirement in _SETTINGS_SCHEMA:
+        final_settings[final_key] = sections[section].get(key, default)
 
     # Validate essential paths after merging
-    if not final_settings.get('remote_name'):
-        print("ERROR: 'rclone_paths.remote_name' must be defined in the effective configuration.", file=sys.stderr)
-        sys.exit(1)
-    if not all([
-            final_settings.get('source_rclone_path_on_remote'),
-            final_settings.get('dest_parent_rclone_path_on_remote') is not None, # Can be "" for root
-            final_settings.get('backup_folder_name')
-        ]):
-        print("ERROR: Job-specific rclone path information must be defined in [rclone_paths] section:", file=sys.stderr)
-        print("       - 'source_path', 'destination_parent_path', 'backup_folder_name'", file=sys.stderr)
-        print("       These must be fully resolved after merging 'config.toml' and any control file.", file=sys.stderr)
-        sys.exit(1)
-
-    rclone_options_cfg = effective_config.get('rclone_options', {})
-    final_settings['rclone_flags'] = rclone_options_cfg.get('flags', [])
-
-    chunking_cfg = effective_config.get('chunking', {})
-    final_settings['run_duration_seconds'] = chunking_cfg.get('run_duration_seconds')
-    if not isinstance(final_settings.get('run_duration_seconds'), int) or final_settings['run_duration_seconds'] <= 0:
-        print(f"ERROR: Invalid or missing 'run_duration_seconds' ({final_settings.get('run_duration_seconds')}). "
-              "Must be a positive integer defined in the effective config's [chunking] section.", file=sys.stderr)
-        sys.exit(1)
-
-    logging_cfg = effective_config.get('logging', {})
-    final_settings['log_dir'] = logging_cfg.get('log_dir', 'rclone_chunk_logs_py')
-    final_settings['log_file_basename'] = logging_cfg.get('log_file_basename', 'rclone_copy_chunk')
-    final_settings['upload_logs_to_remote'] = logging_cfg.get('upload_logs_to_remote', False)
-    final_settings['remote_log_upload_path'] = logging_cfg.get('remote_log_upload_path') 
-
-    print("INFO: Effective configuration loaded and validated successfully.")
-    return final_settings
+    if not final_settings['remote_name']:
+        _fail(info_lines, "ERROR: 'rclone_paths.remote_name' must be defined in the effective configuration.")
+    missing_path_keys = []
+    if not final_settings['source_rclone_path_on_remote']:
+        missing_path_keys.append('source_path')
+    if final_settings['dest_parent_rclone_path_on_remote'] is None: # Can be "" for root
+        missing_path_keys.append('destination_parent_path')
+    backup_folder_name = final_settings['backup_folder_name']
+    if not backup_folder_name:
+        missing_path_keys.append('backup_folder_name')
+    if missing_path_keys:
+        _fail(info_lines, "\n".join((
+            "ERROR: Job-specific rclone path information must be defined in [rclone_paths] section:",
+            "       - 'source_path', 'destination_parent_path', 'backup_folder_name'",
+            f"       Missing or empty: {', '.join(repr(key) for key in missing_path_keys)}",
+            "       These must be fully resolved after merging 'config.toml' and any control file.",
+        )))
 
-if __name__ == '__main__':
-    # Basic test harness for direct execution of this module
-    print("INFO: Testing modules/config_handler.py module...")
-    print("INFO: This test will attempt to load 'config.toml' and 'control.toml' (if present).")
-    print("      Create dummy versions of these files in the script's root for a full test.")
-    
-    # For this test to run without erroring out immediately, ensure a minimal
-    # config.toml exists or provide more robust dummy file creation.
-    # The current dummy creation logic below is illustrative.
-    
-    test_config_path = Path.cwd() / BASE_CONFIG_FILENAME
-    test_control_path = Path.cwd() / DEFAULT_CONTROL_FILENAME
-    created_dummy_config = False
-    created_dummy_control = False
-
-    if not test_config_path.exists():
-        print(f"INFO: Creating dummy '{test_config_path.name}' for testing...")
-        with open(test_config_path, 'w', encoding='utf-8') as f: # tomllib loads binary, but basic toml can be written as text
-            f.write('title = "Test Base Config"\n')
-            f.write('[rclone_paths]\nremote_name = "testremote"\n')
-            f.write('source_path = "test_source"\ndestination_parent_path = ""\n') # Assuming root
-            f.write('backup_folder_name = "test_backup_name"\n')
-            f.write('[chunking]\nrun_duration_seconds = 10\n')
-        created_dummy_config = True
-        
-    if not test_control_path.exists():
-        # Only create dummy control if no CLI arg would be passed in a real test
-        pass # Let load_effective_config handle its absence or presence
-
-    print("\n--- Test Case: Loading with default control.toml (if it exists) or base config only ---")
-    try:
-        cfg_test = load_effective_config() # Test with no CLI argument
-        print("\nEffective Config from test:")
-        for k_test, v_test in cfg_test.items():
-            if isinstance(v_test, dict):
-                print(f"  {k_test}:")
-                for sub_k, sub_v in v_test.items():
-                    print(f"    {sub_k}: {sub_v}")
-            else:
-                print(f"  {k_test}: {v_test}")
-    except SystemExit as e:
-        print(f"Test run exited as expected due to config validation: code {e.code}")
-    except Exception as e_test:
-        print(f"Error during module test: {e_test}")
-
-
-    print("\nINFO: config_handler.py module test block complete.")
-
-    # Clean up dummy files if they were created by this test
-    if created_dummy_config and test_config_path.exists():
-        print(f"INFO: Removing dummy '{test_config_path.name}' created for testing.")
-        test_config_path.unlink()
-    # if created_dummy_control and test_control_path.exists(): # Control file not created in this example test
-    #     print(f"INFO: Removing dummy '{test_control_path.name}' created for testing.")
-    #     test_control_path.unlink()
+    # Validate integer settings against their minimum
+    for final_key, key, default, minimum, requirement in _INT_SETTINGS:
+        value = final_settings[final_key]
+        if not isinstance(value, int) or value < minimum:
+            _fail(info_lines, f"ERROR: {'Invalid or missing' if default is None else 'Invalid'} '{key}' ({value}). {requirement}")
+
+    if final_settings['rclone_flags'] is None:
+        final_settings['rclone_flags'] = []
+    if not final_settings['state_dir']:
+        final_settings['state_dir'] = os.path.join('rclone_chunk_state', backup_folder_name)
+    # The rclone source and destination are fixed for the job, so build them once here
+    # (and cache them with the rest) rather than for every chunk.
+    remote_name = final_settings['remote_name']
+    final_settings['full_source_rclone_path'] = f"{remote_name}:{final_settings['source_rclone_path_on_remote']}"
+    final_settings['full_destination_rclone_path'] = (
+        f"{remote_name}:{join_remote_path(final_settings['dest_parent_rclone_path_on_remote'], backup_folder_name)}")
+
+    final_settings = EffectiveConfig(**final_settings)
+    if _VERBOSE:
+        info_lines.append("INFO: Effective configuration loaded and validated successfully.")
+    # Callers add run state to the returned settings, so the memo keeps its own copy.
+    if from_files_only:
+        _validated_config_memo[memo_key] = (files_signature, copy.deepcopy(final_settings))
+    if use_disk_cache:
+        _write_cached_settings(settings_cache_path, settings_cache_check, final_settings)
+    return final_settings
 
 # end of modules/config_handler.py
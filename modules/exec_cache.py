@@ -0,0 +1,115 @@
+# modules/exec_cache.py
+"""
+Fast path for re-running an unchanged 'exec_rclone' job for the chunk_rclone utility.
+
+- When a chunk is about to exec rclone, the final rclone command and the details
+  needed to name its log file are saved in '<cache dir>/last_cmd.json', together
+  with the modification times/sizes of the configuration files it came from and
+  the code's fingerprint (see modules/common.py).
+- The next run with the same working directory, control file and --dry-run setting
+  execs that command directly if none of those files changed, without importing
+  tomllib or the rest of the modules package.
+
+Only lightweight standard library modules are imported here, since this module is
+loaded on every run before anything else.
+"""
+
+import json
+import os
+import sys
+import time
+
+from .common import code_fingerprint, config_files_signature, next_log_sequence
+
+CACHE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                         "chunk_rclone")
+LAST_CMD_PATH = os.path.join(CACHE_DIR, "last_cmd.json")
+
+def _entry_key(control_file_arg: str, dry_run: bool) -> str:
+    return json.dumps([os.getcwd(), control_file_arg, bool(dry_run)])
+
+def save_last_command(control_file_arg: str, dry_run: bool, config_signature: list, rclone_command: list,
+                      log_dir: str, log_file_basename: str, log_file_name_suffix: str, state_dir: str) -> None:
+    """
+    Records rclone_command as the command to exec for this job while its configuration
+    files still match config_signature. Saving is best-effort; errors are ignored.
+    """
+    try:
+        with open(LAST_CMD_PATH, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+        if not isinstance(entries, dict):
+            entries = {}
+    except (OSError, ValueError):
+        entries = {}
+    entries[_entry_key(control_file_arg, dry_run)] = {
+        'version': code_fingerprint(),
+        'signature': config_signature,
+        'cmd': [str(arg) for arg in rclone_command],
+        'log_dir': log_dir,
+        'log_file_basename': log_file_basename,
+        'log_file_name_suffix': log_file_name_suffix,
+        'state_dir': state_dir,
+    }
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{LAST_CMD_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, LAST_CMD_PATH)
+    except OSError:
+        pass
+
+def exec_cached_command(control_file_arg: str, dry_run: bool) -> None:
+    """
+    Execs the saved rclone command for this job if its configuration files are
+    unchanged since it was saved (and by the same version of the code). Returns if
+    there is no usable saved command, RCLONE_CHUNK_NOCACHE=1 is set, or the exec
+    fails, so the caller can load the configuration as usual.
+    """
+    if os.environ.get("RCLONE_CHUNK_NOCACHE") == "1":
+        return
+    try:
+        with open(LAST_CMD_PATH, 'r', encoding='utf-8') as f:
+            entry = json.load(f)[_entry_key(control_file_arg, dry_run)]
+        rclone_command = entry['cmd']
+        log_dir = entry['log_dir']
+        state_dir = entry['state_dir']
+        log_file_name_suffix = entry['log_file_name_suffix']
+        log_file_basename = entry['log_file_basename']
+    except (OSError, ValueError, KeyError, TypeError):
+        return
+    if entry.get('version') != code_fingerprint():
+        return
+    if entry.get('signature') != config_files_signature(os.getcwd(), control_file_arg):
+        return
+    if not rclone_command or not os.access(rclone_command[0], os.X_OK):
+        return
+
+    log_seq = next_log_sequence(state_dir)
+    log_file_name_itself = f"{log_file_basename}_{time.strftime('%Y%m%d_%H%M%S')}" + (f"_{log_seq:06d}" if log_seq is not None else "")
+    log_file_path = os.path.join(log_dir, log_file_name_itself + log_file_name_suffix)
+    try:
+        os.makedirs(log_dir, exist_ok=True)
+        log_fd = os.open(log_file_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+    except OSError:
+        return
+
+    print("INFO: Configuration unchanged since the last run; replacing this Python process with the saved rclone command.")
+    print(f"  Rclone log:  {os.path.abspath(log_file_path)}")
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved_stdout_fd, saved_stderr_fd = os.dup(1), os.dup(2)
+    try:
+        os.dup2(log_fd, 1)
+        os.dup2(log_fd, 2)
+        os.execv(rclone_command[0], rclone_command)
+    except OSError as e:
+        os.dup2(saved_stdout_fd, 1)
+        os.dup2(saved_stderr_fd, 2)
+        print(f"WARNING: Could not exec the saved rclone command ({e}); loading the configuration instead.", file=sys.stderr)
+    finally:
+        os.close(saved_stdout_fd)
+        os.close(saved_stderr_fd)
+        os.close(log_fd)
+
+# end of modules/exec_cache.py
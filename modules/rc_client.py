@@ -0,0 +1,296 @@
+# modules/rc_client.py
+"""
+Talks to a long-lived 'rclone rcd' daemon for the chunk_rclone utility.
+
+- Starts 'rclone rcd' on a local address once per job and records its address,
+  credentials and PID in the job's state directory, so later runs reuse it
+  instead of starting a new rclone process every time.
+- Sends rc commands (e.g., 'operations/copyfile') as JSON POST requests, and
+  runs long commands (e.g., 'sync/copy') as async jobs with status polling.
+- Stops the daemon ('core/quit') once the job no longer needs it.
+"""
+
+import base64
+import json
+import os
+import secrets
+import socket
+import subprocess
+import threading
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+RCD_STATE_FILENAME = "rcd.json"
+RCD_LOG_FILENAME = "rcd.log"
+RCD_START_TIMEOUT_SECONDS = 15
+
+# Daemons already verified in this process, keyed by their state file path, so that
+# later chunks of a continuous run reuse the handle without re-reading rcd.json.
+# Values are (daemon, Popen of the daemon if this process started it, else None).
+# ensure_daemon() also runs on the log upload threads, so the cache (and starting a
+# new daemon) is guarded by _daemon_handles_lock.
+_daemon_handles = {}
+_daemon_handles_lock = threading.Lock()
+
+def rc_call(daemon: dict, command: str, params: dict = None, timeout: float = 30) -> dict:
+    """
+    Sends one rc command to the daemon and returns its decoded JSON reply.
+
+    Args:
+        daemon (dict): Daemon details as returned by ensure_daemon().
+        command (str): rc command path, e.g. 'operations/copyfile'.
+        params (dict, optional): JSON parameters for the command.
+        timeout (float): Seconds to wait for the HTTP reply.
+
+    Raises:
+        RuntimeError: If rclone reports an error for the command, or its reply is not valid JSON.
+        OSError: If the daemon cannot be reached (urllib.error.URLError is an OSError).
+    """
+    credentials = base64.b64encode(f"{daemon['user']}:{daemon['pass']}".encode('utf-8')).decode('ascii')
+    request = urllib.request.Request(
+        f"http://{daemon['addr']}/{command}",
+        data=json.dumps(params or {}).encode('utf-8'),
+        headers={"Content-Type": "application/json", "Authorization": f"Basic {credentials}"},
+        method="POST",
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            reply_body = response.read()
+    except urllib.error.HTTPError as e:
+        try:
+            error_text = json.loads(e.read()).get('error', e.reason)
+        except ValueError:
+            error_text = e.reason
+        raise RuntimeError(f"rc '{command}' failed (HTTP {e.code}): {error_text}") from None
+    try:
+        return json.loads(reply_body or b"{}")
+    except ValueError as e:
+        raise RuntimeError(f"rc '{command}' returned an invalid reply: {e}") from None
+
+def _free_local_addr() -> str:
+    """Returns a currently unused 127.0.0.1:<port> address for the daemon to listen on."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return f"127.0.0.1:{sock.getsockname()[1]}"
+
+def _is_alive(daemon: dict) -> bool:
+    try:
+        rc_call(daemon, "rc/noop", timeout=5)
+        return True
+    except (OSError, RuntimeError):
+        return False
+
+def _read_daemon_state(state_path: Path):
+    """Returns the daemon recorded in state_path, or None if it is missing, unreadable or not written by this module."""
+    try:
+        daemon = json.loads(state_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+    if not (isinstance(daemon, dict) and {'addr', 'user', 'pass'} <= daemon.keys()):
+        return None
+    return daemon
+
+def _handle_running(daemon: dict, process) -> bool:
+    """
+    Whether a cached daemon's process is still running. A daemon started by this
+    process is polled through its Popen, which also reaps it once it has exited (a
+    zombie would still pass os.kill(pid, 0)); one started by an earlier run is not
+    our child, so os.kill(pid, 0) fails as soon as it is gone.
+    """
+    if process is not None:
+        return process.poll() is None
+    try:
+        os.kill(daemon.get('pid'), 0)
+        return True
+    except (OSError, TypeError, OverflowError):
+        return False
+
+def ensure_daemon(state_dir: Path, rclone_flags: list = (), addr: str = None, rclone_bin: str = "rclone") -> dict:
+    """
+    Returns a running 'rclone rcd' daemon for this job, starting one if needed.
+
+    The daemon is recorded in '<state_dir>/rcd.json' (readable by the owner only)
+    and is reused by later runs as long as it still answers and was started with
+    the same rclone flags. It is protected by a random user/password passed through
+    the environment (not the command line), and logs to '<state_dir>/rcd.log'.
+    It keeps running after this script exits; stop it with 'core/quit'.
+    Within one process, a daemon that was already verified is returned straight
+    away while its process is still running.
+
+    Args:
+        state_dir (Path): The job's state directory.
+        rclone_flags (list): Global rclone flags the daemon should run with.
+        addr (str, optional): 'host:port' to listen on; defaults to a free local port.
+        rclone_bin (str): rclone executable to start the daemon with.
+
+    Raises:
+        RuntimeError: If a newly started daemon does not become ready in time.
+        OSError: If rclone cannot be started or the state file cannot be written.
+    """
+    with _daemon_handles_lock:
+        return _ensure_daemon_locked(state_dir, [str(flag) for flag in rclone_flags], addr, rclone_bin)
+
+def _ensure_daemon_locked(state_dir: Path, rclone_flags: list, addr: str, rclone_bin: str) -> dict:
+    """Does the work of ensure_daemon(), with _daemon_handles_lock held."""
+    state_path = state_dir / RCD_STATE_FILENAME
+    cached_daemon, cached_process = _daemon_handles.get(str(state_path), (None, None))
+    if cached_daemon and cached_daemon['flags'] == rclone_flags and _handle_running(cached_daemon, cached_process):
+        return cached_daemon
+    daemon = _read_daemon_state(state_path)
+
+    if daemon and _is_alive(daemon):
+        if daemon.get('flags') == rclone_flags:
+            # Still ours if this process started it (the cache entry was for this same PID).
+            daemon_process = cached_process if cached_daemon and cached_daemon.get('pid') == daemon.get('pid') else None
+            _daemon_handles[str(state_path)] = (daemon, daemon_process)
+            return daemon
+        print("INFO: rclone flags changed since the rc daemon was started; restarting it.")
+        try:
+            rc_call(daemon, "core/quit", timeout=5)
+        except (OSError, RuntimeError):
+            pass
+
+    state_dir.mkdir(parents=True, exist_ok=True)
+    daemon = {
+        'addr': addr or _free_local_addr(),
+        'user': "chunk_rclone",
+        'pass': secrets.token_urlsafe(24),
+        'flags': rclone_flags,
+    }
+    rcd_env = dict(os.environ, RCLONE_RC_USER=daemon['user'], RCLONE_RC_PASS=daemon['pass'])
+    rcd_command = [rclone_bin, "rcd", f"--rc-addr={daemon['addr']}",
+                   f"--log-file={(state_dir / RCD_LOG_FILENAME).resolve()}", *rclone_flags]
+    process = subprocess.Popen(
+        rcd_command,
+        env=rcd_env,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True # Detach so the daemon outlives this run and ignores its Ctrl+C
+    )
+    daemon['pid'] = process.pid
+
+    state_fd = os.open(state_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(state_fd, 'w', encoding='utf-8') as f:
+        json.dump(daemon, f)
+
+    deadline = time.monotonic() + RCD_START_TIMEOUT_SECONDS
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"'rclone rcd' exited with code {process.returncode}; see '{state_dir / RCD_LOG_FILENAME}'")
+        if _is_alive(daemon):
+            print(f"INFO: Started rclone rc daemon (PID {process.pid}) on {daemon['addr']}.")
+            _daemon_handles[str(state_path)] = (daemon, process)
+            return daemon
+        time.sleep(0.2)
+    raise RuntimeError(f"'rclone rcd' did not become ready on {daemon['addr']} "
+                       f"within {RCD_START_TIMEOUT_SECONDS} seconds")
+
+class JobInterrupted(KeyboardInterrupt):
+    """
+    Raised by run_async_job() on Ctrl+C, once the job has been stopped and given its
+    grace period; status is its last 'job/status' reply (check 'finished').
+    """
+    def __init__(self, job_id, status: dict):
+        super().__init__(job_id)
+        self.job_id = job_id
+        self.status = status
+
+def run_async_job(daemon: dict, command: str, params: dict, timeout_seconds: float,
+                  poll_interval: float = 2.0, stop_grace_seconds: float = 30):
+    """
+    Runs an rc command as an async job ('_async': true) and waits for it to finish.
+
+    If the job is still running after timeout_seconds (or on Ctrl+C) it is stopped
+    with 'job/stop', and its final status is awaited for up to stop_grace_seconds.
+
+    Returns:
+        tuple: (job_id, final 'job/status' reply as a dict, timed_out as bool).
+
+    Raises:
+        JobInterrupted: On Ctrl+C, after the job has been stopped (a KeyboardInterrupt).
+        RuntimeError: As for rc_call(), or if the daemon's reply has no job ID.
+        OSError: As for rc_call().
+    """
+    reply = rc_call(daemon, command, dict(params, _async=True))
+    job_id = reply.get('jobid') if isinstance(reply, dict) else None
+    if job_id is None:
+        raise RuntimeError(f"rc '{command}' did not return a job ID: {reply!r}")
+    deadline = time.monotonic() + timeout_seconds
+    timed_out = False
+    try:
+        while True:
+            status = rc_call(daemon, "job/status", {'jobid': job_id})
+            if status.get('finished'):
+                return job_id, status, timed_out
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(min(poll_interval, max(deadline - time.monotonic(), 0.05)))
+    except KeyboardInterrupt:
+        rc_call(daemon, "job/stop", {'jobid': job_id})
+        status = {}
+        try:
+            if stop_grace_seconds > 0:
+                status = wait_for_job(daemon, job_id, stop_grace_seconds, min(poll_interval, 1.0))
+        except KeyboardInterrupt:
+            pass # A second Ctrl+C cuts the grace period short; the job counts as unfinished
+        raise JobInterrupted(job_id, status) from None
+
+    timed_out = True
+    rc_call(daemon, "job/stop", {'jobid': job_id})
+    if stop_grace_seconds > 0:
+        status = wait_for_job(daemon, job_id, stop_grace_seconds, min(poll_interval, 1.0))
+    return job_id, status, timed_out
+
+def wait_for_job(daemon: dict, job_id, timeout_seconds: float, poll_interval: float = 1.0) -> dict:
+    """
+    Polls an async job until it has finished or timeout_seconds have passed.
+
+    Returns:
+        dict: The last 'job/status' reply; check its 'finished' key.
+
+    Raises:
+        RuntimeError, OSError: As for rc_call() (e.g. if the daemon no longer knows the job).
+    """
+    deadline = time.monotonic() + timeout_seconds
+    while True:
+        status = rc_call(daemon, "job/status", {'jobid': job_id})
+        if status.get('finished') or time.monotonic() >= deadline:
+            return status
+        time.sleep(min(poll_interval, max(deadline - time.monotonic(), 0.05)))
+
+def stop_daemon(state_dir: Path) -> bool:
+    """
+    Asks the job's recorded daemon to exit ('core/quit') and forgets it, e.g. once
+    the whole job is done. Best-effort: a daemon that is already gone is just forgotten.
+
+    Returns:
+        bool: True if a running daemon was asked to quit.
+    """
+    state_path = state_dir / RCD_STATE_FILENAME
+    with _daemon_handles_lock: # So no other thread picks up the daemon while it quits
+        _cached_daemon, process = _daemon_handles.pop(str(state_path), (None, None))
+        daemon = _read_daemon_state(state_path)
+        if daemon is None:
+            return False
+        try:
+            rc_call(daemon, "core/quit", timeout=5)
+            quit_sent = True
+        except (OSError, RuntimeError):
+            quit_sent = False
+        try:
+            state_path.unlink()
+        except OSError:
+            pass
+        if process is not None:
+            try:
+                process.wait(timeout=5) # Reap it, as this process started it
+            except subprocess.TimeoutExpired:
+                pass
+        if quit_sent:
+            print(f"INFO: Stopped the rclone rc daemon (PID {daemon.get('pid')}) on {daemon['addr']}.")
+        return quit_sent
+
+# end of modules/rc_client.py
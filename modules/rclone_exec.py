@@ -9,185 +9,955 @@ Handles the construction and execution of rclone commands for the chunk_rclone u
 - Optionally uploads the rclone log file to a remote destination.
 """
 
+import atexit
+import dataclasses
+import gzip
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import stat
 import subprocess
 import sys
-from datetime import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
+from typing import Optional
 import shlex # For safely displaying the command string
+try:
+    import orjson as _json_parser # Optional, faster parsing of rclone's JSON log lines
+except ImportError:
+    _json_parser = json
+try:
+    import zstandard # Optional; log uploads are compressed with gzip without it
+except ImportError:
+    zstandard = None
 
-def run_rclone_chunk(effective_cfg: dict) -> int:
+from . import common
+from . import exec_cache
+from .config_handler import EffectiveConfig, join_remote_path
+from . import rc_client
+
+# Default seconds a stopped rclone process gets to finish in-flight work before it is
+# killed: the default of [chunking].grace_seconds, as defined by EffectiveConfig.
+STOP_GRACE_SECONDS = EffectiveConfig.__dataclass_fields__['grace_seconds'].default
+
+# Backend-specific flags added when [rclone_tuning].backend_flags is enabled, keyed by
+# the remote's 'type' from its rclone config. SFTP servers are slowed down most by the
+# per-file setstat and hash-check round trips these disable.
+BACKEND_FLAGS = {
+    'sftp': ["--sftp-set-modtime=false", "--sftp-disable-hashcheck"],
+    'drive': ["--drive-pacer-min-sleep=10ms", "--drive-use-trash=false"],
+    's3': ["--s3-upload-concurrency=8", "--s3-chunk-size=64M"],
+}
+REMOTE_TYPE_FILENAME = "remote_type.txt"
+RCLONE_PATH_FILENAME = "rclone_path"
+FILES_LIST_FILENAME = "files.lst"
+# Byte offset in files.lst of the first line not yet handed out in a batch
+FILES_LIST_POS_FILENAME = "files.lst.pos"
+# Records an rc copy job that was stopped but had not finished within grace_seconds,
+# so the next chunk waits for it instead of starting a second copy alongside it.
+RCD_PENDING_JOB_FILENAME = "rcd_pending_job.json"
+# Programs already located by _cached_which() in this process (program -> absolute path).
+_resolved_programs = {}
+# Warnings and errors are written to stderr (text unchanged, e.g. 'WARNING: ...') by a
+# background thread fed through a queue, so callers, including the log upload threads,
+# never block on stderr writes. atexit stops the listener after draining the queue.
+_stderr_queue = queue.SimpleQueue()
+_stderr_handler = logging.StreamHandler(sys.stderr)
+_stderr_handler.setFormatter(logging.Formatter("%(message)s"))
+_stderr_listener = logging.handlers.QueueListener(_stderr_queue, _stderr_handler)
+_stderr_listener.start()
+atexit.register(_stderr_listener.stop)
+logger = logging.getLogger("rclone_exec")
+logger.addHandler(logging.handlers.QueueHandler(_stderr_queue))
+logger.setLevel(logging.WARNING)
+logger.propagate = False
+
+# Log uploads run in the background, so the next chunk (continuous mode) does not wait
+# for them; wait_for_log_uploads() (and, as a last resort, interpreter exit) drains them.
+LOG_UPLOAD_WORKERS = 2
+_log_upload_pool = None
+_pending_log_uploads = []
+
+# How much of the end of a JSON log is searched for rclone's last stats record.
+JSON_LOG_TAIL_BYTES = 64 * 1024
+
+def _present_flag_names(rclone_flags_list: list) -> set:
+    """Returns the names of the long flags in rclone_flags_list ('--name=value' counts as '--name')."""
+    return {str(flag).split('=', 1)[0] for flag in rclone_flags_list if str(flag).startswith('--')}
+
+def _autotuned_flags(rclone_flags_list: list) -> list:
+    """
+    Returns concurrency flags to add to the rclone command when [rclone_tuning].auto
+    is enabled, skipping any flag the user already set in rclone_flags_list.
+
+    The transfer count is derived from os.cpu_count(), clamped to 8-32, with twice
+    as many checkers; files above 64M are copied with 4 parallel streams each, and
+    '--fast-list' trades memory for far fewer listing calls.
+    """
+    present_flags = _present_flag_names(rclone_flags_list)
+    transfers = min(max(os.cpu_count() or 8, 8), 32)
+
+    tuned_flags = []
+    for flag, value in (("--transfers", transfers), ("--checkers", 2 * transfers),
+                        ("--multi-thread-streams", 4), ("--multi-thread-cutoff", "64M")):
+        if flag not in present_flags:
+            tuned_flags.append(f"{flag}={value}")
+    if "--fast-list" not in present_flags:
+        tuned_flags.append("--fast-list")
+    return tuned_flags
+
+@dataclasses.dataclass(eq=False, **({'slots': True} if sys.version_info >= (3, 10) else {}))
+class ChunkResult:
+    """
+    How one run_rclone_chunk() call ended.
+
+    int(result) and comparisons with an int (e.g. result == 0) use status, the exit
+    status the script should report, so callers that treated the return value as an
+    int keep working.
+    """
+    status: int
+    # rclone's own exit code (124 = stopped at the time limit, 130 = Ctrl+C), or None
+    # if rclone was not run
+    rclone_exit: Optional[int] = None
+    # True once nothing is left to copy, so a caller can skip further chunks
+    job_complete: bool = False
+    # From rclone's final stats, if known ([logging] json_log or use_rcd)
+    bytes_transferred: Optional[int] = None
+    elapsed_seconds: float = 0.0
+
+    def __int__(self) -> int:
+        return self.status
+
+    def __eq__(self, other):
+        if isinstance(other, ChunkResult):
+            return dataclasses.astuple(self) == dataclasses.astuple(other)
+        if isinstance(other, int):
+            return self.status == other
+        return NotImplemented
+
+    __hash__ = None
+
+def _json_log_stats(log_path: str) -> Optional[dict]:
+    """
+    Returns the last stats record in an rclone '--use-json-log' log file, or None if
+    there is none. Only the last JSON_LOG_TAIL_BYTES of the file are read, and only
+    lines mentioning "stats" are parsed.
+    """
+    try:
+        with open(log_path, 'rb') as f:
+            f.seek(max(os.fstat(f.fileno()).st_size - JSON_LOG_TAIL_BYTES, 0))
+            tail = f.read()
+    except OSError:
+        return None
+    for line in reversed(tail.split(b"\n")):
+        if b'"stats"' not in line:
+            continue
+        try:
+            stats = _json_parser.loads(line).get('stats')
+        except (ValueError, AttributeError):
+            continue
+        if isinstance(stats, dict):
+            return stats
+    return None
+
+def _stats_summary(stats: dict) -> str:
+    """Returns a one-line summary of an rclone stats record."""
+    return (f"{stats.get('bytes', 0)} of {stats.get('totalBytes', 0)} bytes, "
+            f"{stats.get('transfers', 0)} files transferred, {stats.get('checks', 0)} checked, "
+            f"{stats.get('errors', 0)} errors in {stats.get('elapsedTime', 0):.0f}s")
+
+def _cached_which(state_dir: Path, program: str = "rclone") -> Optional[str]:
+    """
+    Returns the absolute path of program, as found on PATH by shutil.which(), or None
+    if it is not installed. The result is cached in '<state_dir>/rclone_path' and
+    reused for as long as that file is still executable, so later chunks skip the
+    PATH search (and subprocess calls get an absolute path). Within one process
+    (continuous mode) the path is remembered and the file is not read again.
+    """
+    if program in _resolved_programs:
+        return _resolved_programs[program]
+    cache_path = state_dir / RCLONE_PATH_FILENAME
+    try:
+        cached_path = cache_path.read_text(encoding='utf-8').strip()
+        if cached_path and os.access(cached_path, os.X_OK):
+            _resolved_programs[program] = cached_path
+            return cached_path
+    except OSError:
+        pass
+
+    found_path = shutil.which(program)
+    if found_path:
+        found_path = os.path.abspath(found_path)
+        try:
+            common.ensure_dir(state_dir)
+            cache_path.write_text(found_path + "\n", encoding='utf-8')
+        except OSError:
+            pass # Caching is best-effort only.
+        _resolved_programs[program] = found_path
+    return found_path
+
+def _probe_remote_type(remote_name: str, state_dir: Path, rclone_bin: str = "rclone") -> Optional[str]:
+    """
+    Returns the backend type of remote_name (e.g. 'sftp', 'drive', 's3') as reported
+    by 'rclone config show', or None if it cannot be determined. The answer is cached
+    in '<state_dir>/remote_type.txt' as '<remote_name> <type>', so rclone is only asked
+    once per job (and again if the job's remote_name changes).
+    """
+    cache_path = state_dir / REMOTE_TYPE_FILENAME
+    try:
+        # Remote names may contain spaces, types do not.
+        cached_remote_name, _sep, cached_remote_type = cache_path.read_text(encoding='utf-8').strip().rpartition(' ')
+        if cached_remote_name == remote_name and cached_remote_type:
+            return cached_remote_type
+    except OSError:
+        pass
+
+    try:
+        # close_fds=False (with rclone_bin absolute) lets subprocess use posix_spawn; see _run_parallel_workers().
+        show_process = subprocess.run([rclone_bin, "config", "show", remote_name], close_fds=False,
+                                      capture_output=True, text=True, timeout=60, check=False)
+    except (OSError, subprocess.TimeoutExpired) as e:
+        logger.warning(f"WARNING: Could not determine the type of remote '{remote_name}': {e}")
+        return None
+    remote_type = None
+    for line in show_process.stdout.splitlines():
+        key, sep, value = line.partition('=')
+        if sep and key.strip() == 'type':
+            remote_type = value.strip()
+            break
+    if show_process.returncode != 0 or not remote_type:
+        logger.warning(f"WARNING: Could not determine the type of remote '{remote_name}' "
+                       f"(rclone exit code {show_process.returncode}).")
+        return None
+
+    try:
+        common.ensure_dir(state_dir)
+        cache_path.write_text(f"{remote_name} {remote_type}\n", encoding='utf-8')
+    except OSError:
+        pass # Caching is best-effort only; the remote is probed again next run.
+    return remote_type
+
+def _backend_flags(remote_type: Optional[str], rclone_flags_list: list) -> list:
+    """Returns BACKEND_FLAGS for remote_type, skipping any flag the user already set."""
+    present_flags = _present_flag_names(rclone_flags_list)
+    return [flag for flag in BACKEND_FLAGS.get(remote_type, []) if flag.split('=', 1)[0] not in present_flags]
+
+def _files_list_offset(state_dir: Path) -> int:
+    """Returns the saved files.lst offset (0 if there is none yet)."""
+    try:
+        return int((state_dir / FILES_LIST_POS_FILENAME).read_text(encoding='ascii').strip() or 0)
+    except FileNotFoundError:
+        return 0
+    except ValueError as e:
+        raise OSError(f"Invalid offset in '{state_dir / FILES_LIST_POS_FILENAME}': {e}") from None
+
+def _save_files_list_offset(state_dir: Path, offset: int) -> None:
+    """Replaces the saved files.lst offset atomically."""
+    pos_path = state_dir / FILES_LIST_POS_FILENAME
+    tmp_pos_path = pos_path.with_suffix(".pos.tmp")
+    tmp_pos_path.write_text(f"{offset}\n", encoding='ascii')
+    os.replace(tmp_pos_path, pos_path)
+
+def _files_list_done(state_dir: Path) -> bool:
+    """Whether every line of files.lst has been handed out (offset == file size)."""
+    try:
+        files_list_st = os.stat(state_dir / FILES_LIST_FILENAME) # One stat for both the file check and its size
+        return stat.S_ISREG(files_list_st.st_mode) and _files_list_offset(state_dir) >= files_list_st.st_size
+    except OSError:
+        return False
+
+def _next_files_from_batches(state_dir: Path, batch_size: int, batch_count: int,
+                             full_source_rclone_path: str, rclone_flags_list: list,
+                             rclone_bin: str = "rclone") -> list:
+    """
+    Returns up to batch_count '--files-from-raw' batch files for this chunk (one per
+    parallel worker). An empty list means every listed file has already been handed
+    out in a completed batch.
+
+    On first use the source is listed once with 'rclone lsf' into 'files.lst' in
+    state_dir. Batches left over from a chunk that did not complete ('batch*.lst')
+    are reused first; further batches are made from the next batch_size lines of
+    'files.lst', read from the byte offset saved in 'files.lst.pos' (files.lst
+    itself is never rewritten). The caller deletes each batch file once rclone has
+    copied it successfully.
+
+    Raises:
+        OSError: If the state files cannot be read or written.
+        RuntimeError: If listing the source with 'rclone lsf' fails.
+    """
+    files_list_path = state_dir / FILES_LIST_FILENAME
+    common.ensure_dir(state_dir)
+
+    batch_paths = sorted(state_dir.glob("batch*.lst"))[:batch_count]
+    for batch_path in batch_paths:
+        print(f"INFO: Resuming unfinished batch '{batch_path}'.")
+
+    if len(batch_paths) < batch_count and not files_list_path.is_file():
+        print(f"INFO: Listing '{full_source_rclone_path}' once to build '{files_list_path}' (may take a while)...")
+        tmp_list_path = files_list_path.with_suffix(".tmp")
+        list_cmd = [rclone_bin, "lsf", "--files-only", "--fast-list", "-R", *rclone_flags_list, full_source_rclone_path]
+        with open(tmp_list_path, 'wb') as list_file:
+            list_process = subprocess.run(list_cmd, stdout=list_file, close_fds=False, check=False) # posix_spawn, as above
+        if list_process.returncode != 0:
+            tmp_list_path.unlink(missing_ok=True)
+            raise RuntimeError(f"'rclone lsf' exited with code {list_process.returncode}")
+        _save_files_list_offset(state_dir, 0)
+        os.replace(tmp_list_path, files_list_path)
+
+    if len(batch_paths) >= batch_count:
+        return batch_paths
+    offset = _files_list_offset(state_dir)
+    batch_index = 0
+    with open(files_list_path, 'rb') as files_list:
+        files_list.seek(offset)
+        while len(batch_paths) < batch_count:
+            batch_path = state_dir / ("batch.lst" if batch_index == 0 else f"batch_{batch_index}.lst")
+            batch_index += 1
+            if batch_path.exists():
+                continue # Unfinished batch beyond batch_count; left for a later chunk.
+
+            # Hand out the next batch_size lines. The batch is written before the offset moves
+            # past them, so an interruption in between can only duplicate entries, never drop them.
+            batch_lines = list(islice(files_list, batch_size))
+            if not batch_lines:
+                break
+            tmp_batch_path = batch_path.with_suffix(".tmp")
+            with open(tmp_batch_path, 'wb') as batch_file:
+                batch_file.writelines(batch_lines)
+            os.replace(tmp_batch_path, batch_path)
+            offset += sum(map(len, batch_lines))
+            _save_files_list_offset(state_dir, offset)
+            print(f"INFO: Prepared batch of {len(batch_lines)} file(s) in '{batch_path}'.")
+            batch_paths.append(batch_path)
+    return batch_paths
+
+def _run_parallel_workers(worker_commands: list, worker_log_fds: list, run_duration_seconds: int,
+                          grace_seconds: int = STOP_GRACE_SECONDS) -> tuple:
+    """
+    Runs one or more rclone processes at once (one per batch) and waits for all of them,
+    sharing a single run_duration_seconds deadline. At the deadline, workers still
+    running get SIGTERM, so rclone can finish in-flight transfers, and grace_seconds
+    to exit before being killed.
+
+    Returns:
+        tuple: (list of per-worker exit codes, timed_out as bool).
+
+    Raises:
+        KeyboardInterrupt: After all workers (which share the terminal's Ctrl+C) have exited.
+        OSError: If a worker cannot be started (workers already started are killed).
+    """
+    # With an absolute executable path and close_fds=False, subprocess starts rclone via
+    # posix_spawn (vfork-like) instead of fork+exec, which avoids copying this process's
+    # page tables. Nothing leaks into rclone: the log fds are opened non-inheritable.
+    # Callers pass the absolute path from _cached_which(); anything else is looked up here.
+    # If rclone is not on PATH, Popen below raises FileNotFoundError as usual.
+    rclone_path = None
+    if worker_commands:
+        rclone_path = worker_commands[0][0]
+        if not os.path.isabs(rclone_path):
+            rclone_path = shutil.which(rclone_path)
+    processes = []
+    try:
+        for worker_command, worker_log_fd in zip(worker_commands, worker_log_fds):
+            processes.append(subprocess.Popen(worker_command, executable=rclone_path, close_fds=False,
+                                              stdout=worker_log_fd, stderr=subprocess.STDOUT))
+    except OSError:
+        for process in processes:
+            process.kill()
+            process.wait()
+        raise
+
+    deadline = time.monotonic() + run_duration_seconds
+    timed_out = False
+    try:
+        for process in processes:
+            process.wait(timeout=max(deadline - time.monotonic(), 0))
+    except subprocess.TimeoutExpired:
+        timed_out = True
+        for process in processes:
+            if process.poll() is None:
+                process.terminate()
+        # One grace period shared by all workers, like the run deadline above.
+        grace_deadline = time.monotonic() + grace_seconds
+        for process in processes:
+            try:
+                process.wait(timeout=max(grace_deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.wait()
+        raise
+    return [process.returncode for process in processes], timed_out
+
+def _upload_log_via_subprocess(local_log_path: str, full_remote_log_dest: str, rclone_bin: str = "rclone") -> None:
+    """
+    Uploads the chunk's log file with a separate 'rclone rcat' process, which streams
+    the file from its stdin to the remote without rclone having to stat the source.
+    Only rclone's stderr (its error messages) is kept, and shown only on failure.
+    """
+    upload_log_cmd = [rclone_bin, "rcat", full_remote_log_dest] 
+    try:
+        with open(local_log_path, 'rb', buffering=1 << 20) as log_file:
+            upload_process = subprocess.run(
+                upload_log_cmd, 
+                close_fds=False, # posix_spawn; see _run_parallel_workers()
+                stdin=log_file,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.PIPE,
+                check=False, 
+                timeout=120  # 2 minute timeout for log upload
+            )
+        if upload_process.returncode == 0:
+            print("INFO: Log file uploaded successfully.")
+        else:
+            logger.warning(f"WARNING: Failed to upload log file '{os.path.basename(local_log_path)}'. Rclone exit code: {upload_process.returncode}")
+            if upload_process.stderr: 
+                logger.warning(f"Rclone stderr (log upload):\n{upload_process.stderr.decode('utf-8', 'replace').strip()}")
+    except subprocess.TimeoutExpired:
+         logger.warning(f"WARNING: Timeout during log upload to {full_remote_log_dest}")
+    except FileNotFoundError: # Should have been caught by main rclone call
+        logger.error("ERROR: 'rclone' command not found for log upload.")
+    except (OSError, subprocess.SubprocessError) as e_upload_generic: # E.g. the log file cannot be read
+         logger.warning(f"WARNING: An error occurred during log upload: {e_upload_generic}")
+
+def _upload_log_via_rcd(effective_cfg: EffectiveConfig, rcd_flags: list, local_log_path: str,
+                        remote_name: str, remote_log_dir: str, rclone_bin: str = "rclone") -> bool:
+    """
+    Uploads the chunk's log file through the job's 'rclone rcd' daemon, as an async
+    'operations/copyfile' job whose status is polled, avoiding a separate rclone
+    process start and a long-held HTTP request.
+
+    Returns:
+        bool: True if the upload succeeded or timed out (as with the subprocess
+              path, it is not retried); False if the caller should fall back to
+              uploading with a separate rclone process.
+    """
+    try:
+        daemon = rc_client.ensure_daemon(Path(effective_cfg.state_dir), rcd_flags, effective_cfg.rcd_addr,
+                                         rclone_bin)
+        job_id, job_status, timed_out = rc_client.run_async_job(daemon, "operations/copyfile", {
+            'srcFs': os.path.dirname(local_log_path),
+            'srcRemote': os.path.basename(local_log_path),
+            'dstFs': f"{remote_name}:{remote_log_dir}",
+            'dstRemote': os.path.basename(local_log_path),
+        }, 120, poll_interval=0.5) # 2 minute timeout for log upload, as for the subprocess path
+    except (OSError, RuntimeError) as e:
+        logger.warning(f"WARNING: Log upload via rclone rc daemon failed ({e}); falling back to 'rclone rcat'.")
+        return False
+    if timed_out:
+        logger.warning(f"WARNING: Timeout during log upload via rclone rc daemon (job {job_id})")
+        return True
+    if not job_status.get('success'):
+        logger.warning(f"WARNING: Log upload via rclone rc daemon failed ({job_status.get('error')}); "
+                       "falling back to 'rclone rcat'.")
+        return False
+    print("INFO: Log file uploaded successfully (via rclone rc daemon).")
+    return True
+
+# Appended to the names of compressed log uploads ([logging] compress_log_uploads).
+COMPRESSED_LOG_SUFFIX = ".zst" if zstandard else ".gz"
+
+def _compress_log(local_log_path: str) -> Optional[str]:
+    """
+    Writes a compressed copy of a log file next to it, with zstandard (level 3, using
+    all cores) if installed, else gzip. Returns the copy's path ('.zst' or '.gz'
+    appended), or None (after a warning) if it could not be written.
+    """
+    compressed_path = local_log_path + COMPRESSED_LOG_SUFFIX
+    try:
+        with open(local_log_path, 'rb') as log_file, open(compressed_path, 'wb') as compressed_file:
+            if zstandard:
+                zstandard.ZstdCompressor(level=3, threads=-1).copy_stream(log_file, compressed_file)
+            else:
+                with gzip.GzipFile(fileobj=compressed_file, mode='wb', compresslevel=6) as gzip_file:
+                    shutil.copyfileobj(log_file, gzip_file, 1 << 20)
+    except OSError as e:
+        logger.warning(f"WARNING: Could not compress log file '{os.path.basename(local_log_path)}' ({e}); "
+                       "uploading it uncompressed.")
+        return None
+    return compressed_path
+
+def _upload_log(effective_cfg: EffectiveConfig, use_rcd: bool, rcd_flags: list, local_log_path: str,
+                remote_name: str, remote_log_dir: str, full_remote_log_dest: str, rclone_bin: str) -> None:
+    """
+    Uploads one log file, through the rc daemon if enabled, else with a separate rclone
+    process. With [logging] compress_log_uploads, a compressed copy is uploaded instead
+    (under the log's name plus '.zst' or '.gz') and then removed locally.
+    """
+    compressed_path = _compress_log(local_log_path) if effective_cfg.compress_log_uploads else None
+    if compressed_path:
+        full_remote_log_dest += compressed_path[len(local_log_path):]
+        local_log_path = compressed_path
+    try:
+        if not (use_rcd
+                and _upload_log_via_rcd(effective_cfg, rcd_flags, local_log_path, remote_name, remote_log_dir, rclone_bin)):
+            _upload_log_via_subprocess(local_log_path, full_remote_log_dest, rclone_bin)
+    finally:
+        if compressed_path:
+            try:
+                os.unlink(compressed_path)
+            except OSError:
+                pass
+
+def _submit_log_upload(*upload_args) -> None:
+    """Starts _upload_log(*upload_args) on the background upload pool."""
+    global _log_upload_pool
+    if _log_upload_pool is None:
+        _log_upload_pool = ThreadPoolExecutor(max_workers=LOG_UPLOAD_WORKERS, thread_name_prefix="log_upload")
+        atexit.register(_log_upload_pool.shutdown, wait=True)
+    _pending_log_uploads.append(_log_upload_pool.submit(_upload_log, *upload_args))
+
+def wait_for_log_uploads() -> None:
+    """
+    Waits for all log uploads started by run_rclone_chunk() to finish. Call this
+    before exiting; upload failures are reported as warnings by the uploads themselves.
+    """
+    while _pending_log_uploads:
+        upload_future = _pending_log_uploads.pop(0)
+        try:
+            upload_future.result()
+        except Exception as e:
+            logger.warning(f"WARNING: An error occurred during log upload: {e}")
+
+def stop_rc_daemon(effective_cfg: EffectiveConfig) -> None:
+    """
+    Stops the job's rc daemon (use_rcd), e.g. once the whole job is complete. Call
+    this after wait_for_log_uploads(), as the log uploads may still be using it.
+    """
+    rc_client.stop_daemon(Path(effective_cfg.state_dir))
+
+def _await_pending_rcd_job(daemon: dict, state_dir: Path, timeout_seconds: int) -> None:
+    """
+    Waits for a copy job recorded by an earlier chunk as still running after it was
+    stopped (see RCD_PENDING_JOB_FILENAME), so two copies never run at once.
+
+    Raises:
+        RuntimeError: If the job is still running after timeout_seconds.
+        OSError: If the daemon cannot be reached.
+    """
+    pending_job_path = state_dir / RCD_PENDING_JOB_FILENAME
+    try:
+        pending_job = json.loads(pending_job_path.read_text(encoding='utf-8'))
+        job_id, job_daemon_pid = pending_job['jobid'], pending_job['pid']
+    except (OSError, ValueError, KeyError, TypeError):
+        return
+    # A job of a daemon that has since been replaced died with it.
+    if job_daemon_pid == daemon.get('pid'):
+        try:
+            job_status = rc_client.wait_for_job(daemon, job_id, 0)
+            if not job_status.get('finished'):
+                print(f"INFO: Waiting up to {timeout_seconds} seconds for rc job {job_id} of an earlier chunk to stop...")
+                job_status = rc_client.wait_for_job(daemon, job_id, timeout_seconds)
+        except RuntimeError:
+            job_status = {'finished': True} # The daemon no longer knows the job
+        if not job_status.get('finished'):
+            raise RuntimeError(f"rc job {job_id} of an earlier chunk is still running after {timeout_seconds} seconds; "
+                               "not starting another copy alongside it")
+    pending_job_path.unlink(missing_ok=True)
+
+def _record_pending_rcd_job(daemon: dict, state_dir: Path, job_id, grace_seconds: int) -> None:
+    """Records a stopped copy job that is still running, for _await_pending_rcd_job() to wait for."""
+    logger.warning(f"WARNING: Rclone job {job_id} has not finished within {grace_seconds} seconds of being stopped; "
+                   "the next chunk will wait for it.")
+    try:
+        (state_dir / RCD_PENDING_JOB_FILENAME).write_text(
+            json.dumps({'jobid': job_id, 'pid': daemon.get('pid')}), encoding='utf-8')
+    except OSError as e:
+        logger.warning(f"WARNING: Could not record unfinished rc job {job_id}: {e}")
+
+def _run_copy_via_rcd(daemon: dict, full_source_rclone_path: str, full_destination_rclone_path: str,
+                      batch_path: Optional[Path], is_dry_run: bool, run_duration_seconds: int, log_fd: int,
+                      grace_seconds: int = STOP_GRACE_SECONDS, state_dir: Optional[Path] = None) -> tuple:
+    """
+    Runs the chunk's copy as an async 'sync/copy' job on the rc daemon, stopping it
+    with 'job/stop' once run_duration_seconds have passed. The job's final status and
+    transfer stats are appended to the chunk's log file (the daemon itself logs to
+    '<state_dir>/rcd.log').
+
+    With state_dir, a job that is still running grace_seconds after being stopped
+    (at the time limit or on Ctrl+C) is recorded there, and the next call waits for it (up to its own run_duration_seconds)
+    before submitting a new job.
+
+    Returns:
+        tuple: (exit code, the job's 'core/stats' reply as a dict). The exit code is
+               0 if the job finished successfully, 124 if it was stopped at the
+               time limit, 1 if rclone reported an error.
+
+    Raises:
+        KeyboardInterrupt: After the job has been stopped and given grace_seconds to finish.
+        RuntimeError, OSError: If the daemon cannot be reached (RuntimeError also if an
+                               earlier chunk's job is still running).
+    """
+    if state_dir:
+        _await_pending_rcd_job(daemon, state_dir, run_duration_seconds)
+    params = {'srcFs': full_source_rclone_path, 'dstFs': full_destination_rclone_path, '_config': {}}
+    if is_dry_run:
+        params['_config']['DryRun'] = True
+    if batch_path:
+        params['_filter'] = {'FilesFromRaw': [str(batch_path.resolve())]}
+        params['_config']['NoTraverse'] = True
+
+    sys.stdout.write(f"\nINFO: rclone copy job submitted to the rc daemon on {daemon['addr']}. "
+                     f"Will run for up to {run_duration_seconds} seconds...\n"
+                     "INFO: Press Ctrl+C in this terminal to stop the job.\n")
+    sys.stdout.flush() # Show it now, not when the job ends, if stdout is a pipe
+    try:
+        job_id, job_status, timed_out = rc_client.run_async_job(daemon, "sync/copy", params, run_duration_seconds,
+                                                                 stop_grace_seconds=grace_seconds)
+    except rc_client.JobInterrupted as e:
+        if not e.status.get('finished') and state_dir:
+            _record_pending_rcd_job(daemon, state_dir, e.job_id, grace_seconds)
+        raise
+    job_stats = rc_client.rc_call(daemon, "core/stats", {'group': f"job/{job_id}"})
+    os.write(log_fd, (f"rc job {job_id} status: {json.dumps(job_status)}\n"
+                      f"rc job {job_id} stats: {json.dumps(job_stats)}\n").encode('utf-8'))
+
+    if timed_out:
+        print(f"\nINFO: Rclone job {job_id} was stopped after {run_duration_seconds} seconds (as scheduled).")
+        if not job_status.get('finished') and state_dir:
+            _record_pending_rcd_job(daemon, state_dir, job_id, grace_seconds)
+        return 124, job_stats
+    if job_status.get('success'):
+        return 0, job_stats
+    logger.error(f"ERROR: Rclone job {job_id} failed: {job_status.get('error')}")
+    return 1, job_stats
+
+def run_rclone_chunk(effective_cfg: EffectiveConfig) -> ChunkResult:
     """
     Runs a single chunk of the rclone copy operation using the effective configuration.
 
     Args:
-        effective_cfg (dict): The fully resolved configuration dictionary
-                              containing all necessary parameters for the rclone job.
-                              Expected keys include: 'remote_name', 
-                              'source_rclone_path_on_remote', 
-                              'dest_parent_rclone_path_on_remote', 
-                              'backup_folder_name', 'run_duration_seconds', 
-                              'log_dir', 'log_file_basename', 
-                              'rclone_flags' (list), 'is_dry_run' (bool),
-                              'upload_logs_to_remote' (bool, optional),
-                              'remote_log_upload_path' (str, optional if upload is true).
+        effective_cfg (EffectiveConfig): The validated settings for the rclone job,
+                                         as returned by load_effective_config()
+                                         (with 'is_dry_run' set by the caller).
+
+    Log uploads (upload_logs_to_remote) are started in the background and may still
+    be running when this returns; call wait_for_log_uploads() before exiting.
 
     Returns:
-        int: Exit status.
+        ChunkResult: How the chunk ended. Its status (also int(result)) is:
              0 for normal operations (rclone success, timeout, or user Ctrl+C).
              1 for script's own critical errors (e.g., rclone not found, bad config key).
              Other non-zero values are rclone's own error codes if it exited with an error.
     """
-    
+    chunk_start_time = time.monotonic()
+
     # Extract necessary parameters from effective_cfg
-    try:
-        remote_name = effective_cfg['remote_name']
-        source_rclone_path_on_remote = effective_cfg['source_rclone_path_on_remote']
-        dest_parent_rclone_path_on_remote = effective_cfg['dest_parent_rclone_path_on_remote']
-        backup_folder_name = effective_cfg['backup_folder_name']
-        run_duration_seconds = effective_cfg['run_duration_seconds']
-        log_dir_str = effective_cfg['log_dir'] 
-        log_file_basename = effective_cfg['log_file_basename'] 
-        rclone_flags_list = effective_cfg.get('rclone_flags', []) 
-        is_dry_run = effective_cfg.get('is_dry_run', False)
-    except KeyError as e:
-        print(f"ERROR: rclone_exec: Missing a critical configuration key in effective_cfg: {e}", file=sys.stderr)
-        return 1 
-
-    # Construct full rclone paths
-    full_source_rclone_path = f"{remote_name}:{source_rclone_path_on_remote}"
-    # Pathlib handles joining correctly, even if dest_parent_rclone_path_on_remote is empty ("")
-    dest_path_part = Path(dest_parent_rclone_path_on_remote) / backup_folder_name
-    full_destination_rclone_path = f"{remote_name}:{str(dest_path_part)}"
+    remote_name = effective_cfg.remote_name
+    source_rclone_path_on_remote = effective_cfg.source_rclone_path_on_remote
+    dest_parent_rclone_path_on_remote = effective_cfg.dest_parent_rclone_path_on_remote
+    backup_folder_name = effective_cfg.backup_folder_name
+    run_duration_seconds = effective_cfg.run_duration_seconds
+    log_dir_str = effective_cfg.log_dir 
+    log_file_basename = effective_cfg.log_file_basename 
+    rclone_flags_list = effective_cfg.rclone_flags 
+    is_dry_run = effective_cfg.is_dry_run
+    exec_rclone = effective_cfg.exec_rclone
+    grace_seconds = effective_cfg.grace_seconds
+    state_dir = Path(effective_cfg.state_dir) # Built once; used by the state file helpers below
+
+    # Full rclone paths, normally built once by load_effective_config(); built here only for
+    # settings constructed some other way. Remote paths are plain '/'-separated strings, so
+    # they are joined directly rather than via pathlib (works even if dest_parent_rclone_path_on_remote
+    # is empty (""), i.e. the remote root).
+    full_source_rclone_path = (effective_cfg.full_source_rclone_path
+                               or f"{remote_name}:{source_rclone_path_on_remote}")
+    full_destination_rclone_path = (effective_cfg.full_destination_rclone_path
+                                    or f"{remote_name}:{join_remote_path(dest_parent_rclone_path_on_remote, backup_folder_name)}")
 
     # Prepare local log directory and file
     # Assume log_dir_str is relative to CWD (where chunk_rclone.py is run) or absolute
-    log_dir = Path(log_dir_str)
     try:
-        log_dir.mkdir(parents=True, exist_ok=True)
+        common.ensure_dir(log_dir_str)
     except OSError as e:
-        print(f"ERROR: rclone_exec: Could not create local log directory '{log_dir}': {e}", file=sys.stderr)
-        return 1 
+        logger.error(f"ERROR: rclone_exec: Could not create local log directory '{log_dir_str}': {e}")
+        return ChunkResult(1)
         
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    log_file_name_itself = f"{log_file_basename}_{timestamp}"
-    if is_dry_run:
-        log_file_name_itself += "_DRYRUN"
-    log_file_name_itself += ".log"
-    log_file_path = log_dir / log_file_name_itself
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    # The per-job sequence number keeps names unique when several chunks start within one second.
+    log_seq = common.next_log_sequence(effective_cfg.state_dir)
+    log_file_name_itself = f"{log_file_basename}_{timestamp}" + (f"_{log_seq:06d}" if log_seq is not None else "")
+    log_file_name_suffix = "_DRYRUN.log" if is_dry_run else ".log"
+    # Plain strings, made absolute once here and shown/uploaded as they are below.
+    log_dir_abs = os.path.abspath(log_dir_str)
+    log_file_path = os.path.join(log_dir_abs, log_file_name_itself + log_file_name_suffix)
+
+    # Locate rclone once per job rather than searching PATH for every rclone process.
+    rclone_bin = _cached_which(state_dir)
+    if not rclone_bin:
+        logger.error("ERROR: 'rclone' command not found. Is rclone installed and in your system PATH?")
+        return ChunkResult(1)
+
+    # Optionally restrict this chunk to the next batch(es) of a one-time source listing,
+    # so rclone does not re-traverse and re-stat the whole source on every chunk.
+    batch_paths = []
+    files_from_batch_size = effective_cfg.files_from_batch_size
+    parallel_workers = effective_cfg.parallel_workers
+    if parallel_workers > 1 and (not files_from_batch_size or effective_cfg.use_rcd):
+        logger.warning("WARNING: 'parallel_workers' needs 'files_from_batch_size' > 0 and 'use_rcd' = false; "
+                       "running a single rclone process.")
+        parallel_workers = 1
+    if files_from_batch_size:
+        try:
+            batch_paths = _next_files_from_batches(state_dir, files_from_batch_size,
+                                                   parallel_workers, full_source_rclone_path, rclone_flags_list,
+                                                   rclone_bin)
+        except (OSError, RuntimeError) as e:
+            logger.error(f"ERROR: rclone_exec: Could not prepare the --files-from batch: {e}")
+            return ChunkResult(1)
+        if not batch_paths:
+            print(f"INFO: All files listed in '{state_dir / FILES_LIST_FILENAME}' have been copied; "
+                  "nothing left to do. Delete that file to list the source again.")
+            return ChunkResult(0, rclone_exit=0, job_complete=True, elapsed_seconds=time.monotonic() - chunk_start_time)
+
+    batch_path = batch_paths[0] if batch_paths else None
+
+    # Work out the optional flags first, so the rclone command list is built in one go below.
+    tuned_flags = []
+    if effective_cfg.rclone_tuning_auto:
+        tuned_flags = _autotuned_flags(rclone_flags_list)
+        if tuned_flags:
+            print(f"INFO: [rclone_tuning] auto: adding {' '.join(tuned_flags)}")
+    if effective_cfg.rclone_tuning_backend_flags:
+        remote_type = _probe_remote_type(remote_name, state_dir, rclone_bin)
+        backend_flags = _backend_flags(remote_type, rclone_flags_list)
+        if backend_flags:
+            print(f"INFO: [rclone_tuning] backend_flags: adding {' '.join(backend_flags)} for '{remote_type}' remote")
+            tuned_flags = tuned_flags + backend_flags
+
+    use_rcd = effective_cfg.use_rcd
+    if exec_rclone and (effective_cfg.upload_logs_to_remote or batch_path or use_rcd
+                        or effective_cfg.continuous):
+        logger.warning("WARNING: 'exec_rclone' is ignored because 'upload_logs_to_remote', 'files_from_batch_size', "
+                       "'use_rcd' or 'continuous' needs this script to keep running after rclone exits.")
+        exec_rclone = False
 
     # Construct rclone command list
-    rclone_base_command = "copy" 
-    rclone_command = ["rclone", rclone_base_command]
-    rclone_command.extend(rclone_flags_list)
-    
-    if is_dry_run:
-        rclone_command.append("--dry-run") 
-    
-    rclone_command.append(f"--log-file={str(log_file_path.resolve())}") 
-    rclone_command.append(full_source_rclone_path)
-    rclone_command.append(full_destination_rclone_path)
+    rclone_command = [
+        rclone_bin, "copy",
+        *rclone_flags_list,
+        *tuned_flags,
+        *((f"--files-from-raw={batch_path}", "--no-traverse") if batch_path else ()),
+        *(("--dry-run",) if is_dry_run else ()),
+        # One JSON object per log line, so the chunk's final stats can be summarized below.
+        *(("--use-json-log",) if effective_cfg.json_log else ()),
+        # With exec_rclone, rclone enforces the chunk duration itself, since no Python parent remains to time it out.
+        *((f"--max-duration={run_duration_seconds}s",) if exec_rclone else ()),
+        full_source_rclone_path,
+        full_destination_rclone_path,
+    ]
 
-    # Print pre-execution info
-    print("=" * 70)
-    run_description = effective_cfg.get('run_description', 'N/A') # Get run_description
-    print(f"Starting Rclone Copy Chunk: {run_description} at {timestamp}")
+    # Additional parallel workers run the same command on their own batch, each with its own log file.
+    worker_commands = [rclone_command]
+    worker_log_paths = [log_file_path]
+    for worker_index, worker_batch_path in enumerate(batch_paths[1:], start=1):
+        worker_commands.append([f"--files-from-raw={worker_batch_path}" if arg == f"--files-from-raw={batch_path}" else arg
+                                for arg in rclone_command])
+        worker_log_paths.append(os.path.join(log_dir_abs, f"{log_file_name_itself}_w{worker_index}{log_file_name_suffix}"))
+
+    # Print pre-execution info, assembled first and written with a single call
+    run_description = effective_cfg.run_description # Get run_description
+    banner_lines = ["=" * 70, f"Starting Rclone Copy Chunk: {run_description} at {timestamp}"]
     if is_dry_run:
-        print("  Mode:        *** DRY RUN *** (Rclone will simulate transfers)")
-    print(f"  Source:      {full_source_rclone_path}")
-    print(f"  Destination: {full_destination_rclone_path}")
-    print(f"  Max duration: {run_duration_seconds} seconds")
-    print(f"  Rclone log:  {log_file_path.resolve()}")
-    try:
-        display_command = ' '.join(shlex.quote(str(arg)) for arg in rclone_command)
-        print(f"  Executing:   {display_command}")
-    except Exception: 
-        print(f"  Executing (raw list):   {rclone_command}")
-    print("-" * 70)
+        banner_lines.append("  Mode:        *** DRY RUN *** (Rclone will simulate transfers)")
+    banner_lines.append(f"  Source:      {full_source_rclone_path}")
+    banner_lines.append(f"  Destination: {full_destination_rclone_path}")
+    banner_lines.append(f"  Max duration: {run_duration_seconds} seconds")
+    for worker_log_path in worker_log_paths:
+        banner_lines.append(f"  Rclone log:  {worker_log_path}")
+    if effective_cfg.show_command:
+        if sys.stdout.isatty():
+            banner_lines.append(f"  Executing:   {shlex.join(map(str, rclone_command))}")
+        else: # Quoting the command is purely cosmetic; skip it for cron/systemd output
+            banner_lines.append(f"  Executing:   {rclone_command[0]} ... ({len(rclone_command)} args)")
+    if len(worker_commands) > 1:
+        banner_lines.append(f"  Workers:     {len(worker_commands)} parallel rclone processes, one batch each")
+    banner_lines.append("-" * 70)
+    sys.stdout.write("\n".join(banner_lines) + "\n")
+
+    # rclone's stdout/stderr go straight to the log file through a single append-only fd,
+    # rather than having rclone open and manage the file itself via --log-file.
+    log_fds = []
+    try:
+        for worker_log_path in worker_log_paths:
+            log_fds.append(os.open(worker_log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644))
+    except OSError as e:
+        logger.error(f"ERROR: rclone_exec: Could not open local log file '{worker_log_path}': {e}")
+        for log_fd in log_fds:
+            os.close(log_fd)
+        return ChunkResult(1)
+    log_fd = log_fds[0]
+
+    if exec_rclone:
+        # Replace this Python process with rclone for the whole chunk. Nothing after
+        # this point runs; rclone's own exit code (10 = duration limit reached) is final.
+        # Later runs with unchanged configuration files exec this same command straight away.
+        if effective_cfg.config_files_signature:
+            exec_cache.save_last_command(effective_cfg.control_file_arg, is_dry_run,
+                                         effective_cfg.config_files_signature, rclone_command, log_dir_str,
+                                         log_file_basename, log_file_name_suffix, effective_cfg.state_dir)
+        print("INFO: Replacing this Python process with rclone (exec_rclone = true).")
+        sys.stdout.flush()
+        _stderr_listener.stop() # Writes out queued warnings before stderr goes to the log file
+        sys.stderr.flush()
+        saved_stdout_fd, saved_stderr_fd = os.dup(1), os.dup(2)
+        try:
+            os.dup2(log_fd, 1)
+            os.dup2(log_fd, 2)
+            os.execvp(rclone_command[0], rclone_command)
+        except OSError as e:
+            os.dup2(saved_stdout_fd, 1)
+            os.dup2(saved_stderr_fd, 2)
+            _stderr_listener.start()
+            logger.error(f"ERROR: Could not exec 'rclone': {e}. Is rclone installed and in your system PATH?")
+            return ChunkResult(1)
+        finally:
+            os.close(saved_stdout_fd)
+            os.close(saved_stderr_fd)
+            os.close(log_fd)
+
+    # The rc daemon runs with the same global flags as a normal rclone process would.
+    rcd_flags = rclone_flags_list + tuned_flags
+    rcd_daemon = None
+    if use_rcd:
+        try:
+            rcd_daemon = rc_client.ensure_daemon(state_dir, rcd_flags, effective_cfg.rcd_addr,
+                                                 rclone_bin)
+        except (OSError, RuntimeError) as e:
+            logger.warning(f"WARNING: Could not use the rclone rc daemon ({e}); running a separate rclone process instead.")
 
     exit_code = 0 
+    worker_exit_codes = None
+    rcd_job_stats = None
     try:
-        print(f"\nINFO: rclone process started. Will run for up to {run_duration_seconds} seconds...")
-        print(f"INFO: Monitor progress via rclone's output (if stats enabled in flags) and in '{log_file_path}'.")
-        print("INFO: Press Ctrl+C in this terminal to attempt graceful shutdown of rclone.")
+        if rcd_daemon:
+            exit_code, rcd_job_stats = _run_copy_via_rcd(rcd_daemon, full_source_rclone_path, full_destination_rclone_path,
+                                                         batch_path, is_dry_run, run_duration_seconds, log_fd,
+                                                         grace_seconds, state_dir)
+        elif len(worker_commands) > 1:
+            sys.stdout.write(f"\nINFO: {len(worker_commands)} rclone processes started. Will run for up to {run_duration_seconds} seconds...\n"
+                             "INFO: Monitor progress (if stats enabled in flags) in the log files listed above.\n"
+                             "INFO: Press Ctrl+C in this terminal to attempt graceful shutdown of rclone.\n")
+            sys.stdout.flush() # Show it now, not when rclone exits, if stdout is a pipe
 
-        process = subprocess.run(
-            rclone_command, 
-            timeout=run_duration_seconds, 
-            check=False 
-        )
-        exit_code = process.returncode
+            worker_exit_codes, timed_out = _run_parallel_workers(worker_commands, log_fds, run_duration_seconds, grace_seconds)
+            if timed_out:
+                print(f"\nINFO: Rclone processes timed out after {run_duration_seconds} seconds (as scheduled).")
+                exit_code = 124
+            else:
+                exit_code = next((code for code in worker_exit_codes if code != 0), 0)
+        else:
+            sys.stdout.write(f"\nINFO: rclone process started. Will run for up to {run_duration_seconds} seconds...\n"
+                             f"INFO: Monitor progress (if stats enabled in flags) in '{log_file_path}'.\n"
+                             "INFO: Press Ctrl+C in this terminal to attempt graceful shutdown of rclone.\n")
+            sys.stdout.flush() # Show it now, not when rclone exits, if stdout is a pipe
+
+            # Unlike subprocess.run(timeout=...), which SIGKILLs rclone, this sends SIGTERM at the
+            # time limit so rclone can finish in-flight transfers instead of redoing them next chunk.
+            (exit_code,), timed_out = _run_parallel_workers([rclone_command], [log_fd], run_duration_seconds, grace_seconds)
+            if timed_out:
+                print(f"\nINFO: Rclone process timed out after {run_duration_seconds} seconds (as scheduled).")
+                exit_code = 124
 
-    except subprocess.TimeoutExpired:
-        print(f"\nINFO: Rclone process timed out after {run_duration_seconds} seconds (as scheduled).")
-        exit_code = 124 
     except FileNotFoundError:
-        print("ERROR: 'rclone' command not found. Is rclone installed and in your system PATH?", file=sys.stderr)
-        return 1 
+        logger.error("ERROR: 'rclone' command not found. Is rclone installed and in your system PATH?")
+        return ChunkResult(1)
     except KeyboardInterrupt:
         print("\nINFO: Keyboard interrupt received by Python script. Rclone process (if started) should terminate gracefully.")
         exit_code = 130 
-    except Exception as e:
-        print(f"\nERROR: An unexpected error occurred while preparing or running rclone: {e}", file=sys.stderr)
+    except (OSError, RuntimeError, subprocess.SubprocessError) as e:
+        # Failures to start or talk to rclone (including the rc daemon's errors and
+        # replies); anything else is a bug and propagates with its traceback.
+        logger.error(f"\nERROR: An unexpected error occurred while preparing or running rclone: {e}")
         exit_code = 1 
+    finally:
+        for log_fd in log_fds:
+            os.close(log_fd)
 
-    # Post-execution messages
-    print("-" * 70)
+    # Post-execution messages, written with a single call
+    footer_lines = ["-" * 70]
     if exit_code == 0:
-        print("INFO: Rclone chunk completed successfully (or all work was done within the duration).")
+        footer_lines.append("INFO: Rclone chunk completed successfully (or all work was done within the duration).")
     elif exit_code == 124:
-        print("INFO: Rclone chunk was terminated due to timeout (as scheduled).")
+        footer_lines.append("INFO: Rclone chunk was terminated due to timeout (as scheduled).")
     elif exit_code == 130:
-        print("INFO: Rclone chunk was likely terminated by user (Ctrl+C via Python script).")
+        footer_lines.append("INFO: Rclone chunk was likely terminated by user (Ctrl+C via Python script).")
     else:
-        print(f"WARNING: Rclone process exited with code {exit_code}. This may indicate rclone errors.")
-        print(f"         Refer to rclone documentation for exit code meanings (e.g., https://rclone.org/docs/#exit-code).")
-        print(f"         Also check the detailed rclone log: {log_file_path.resolve()}")
+        footer_lines.append(f"WARNING: Rclone process exited with code {exit_code}. This may indicate rclone errors.")
+        footer_lines.append(f"         Refer to rclone documentation for exit code meanings (e.g., https://rclone.org/docs/#exit-code).")
+        for worker_log_path in worker_log_paths:
+            footer_lines.append(f"         Also check the detailed rclone log: {worker_log_path}")
+    bytes_transferred = rcd_job_stats.get('bytes') if rcd_job_stats else None
+    if effective_cfg.json_log and not rcd_daemon:
+        for worker_log_path in worker_log_paths:
+            worker_stats = _json_log_stats(worker_log_path)
+            if worker_stats:
+                footer_lines.append(f"INFO: Rclone stats ({os.path.basename(worker_log_path)}): {_stats_summary(worker_stats)}")
+                bytes_transferred = (bytes_transferred or 0) + worker_stats.get('bytes', 0)
+    sys.stdout.write("\n".join(footer_lines) + "\n")
     
-    current_run_log_path_str = str(log_file_path.resolve())
-    print(f"INFO: Log file for this run: {current_run_log_path_str}")
+    # A batch is done only if the worker that copied it exited successfully.
+    if worker_exit_codes is None:
+        worker_exit_codes = [exit_code] * len(batch_paths)
+    for done_batch_path, worker_exit_code in zip(batch_paths, worker_exit_codes):
+        if worker_exit_code != 0 or is_dry_run:
+            continue
+        try:
+            done_batch_path.unlink()
+            print(f"INFO: Batch '{done_batch_path}' completed; the next chunk will start a new batch.")
+        except OSError as e:
+            logger.warning(f"WARNING: Could not remove completed batch '{done_batch_path}': {e}")
+
+    # Let a caller running chunks back to back (continuous mode) know how this chunk ended.
+    # With batching, the job is complete once all of files.lst has been handed out and no batch is left over.
+    if batch_paths:
+        job_complete = _files_list_done(state_dir) and not any(state_dir.glob("batch*.lst"))
+    else:
+        job_complete = exit_code == 0
+
+    for worker_log_path in worker_log_paths:
+        current_run_log_path_str = worker_log_path
+        print(f"INFO: Log file for this run: {current_run_log_path_str}")
 
-    # Upload log file if configured
-    if effective_cfg.get('upload_logs_to_remote', False):
-        remote_log_upload_path_str = effective_cfg.get('remote_log_upload_path')
-        current_remote_name_for_log_upload = effective_cfg.get('remote_name') # Use the job's remote_name
+        # Upload log file if configured
+        if not effective_cfg.upload_logs_to_remote:
+            continue
+        remote_log_upload_path_str = effective_cfg.remote_log_upload_path
+        current_remote_name_for_log_upload = effective_cfg.remote_name # Use the job's remote_name
    
         if remote_log_upload_path_str and current_remote_name_for_log_upload:
-            full_remote_log_dest = f"{current_remote_name_for_log_upload}:{str(Path(remote_log_upload_path_str) / log_file_path.name)}"
+            current_log_file_name = os.path.basename(worker_log_path)
+            full_remote_log_dest = f"{current_remote_name_for_log_upload}:{join_remote_path(remote_log_upload_path_str, current_log_file_name)}"
             
-            print(f"INFO: Attempting to upload log file '{log_file_path.name}' to: {full_remote_log_dest}")
-            upload_log_cmd = ["rclone", "copyto", current_run_log_path_str, full_remote_log_dest, "--progress"] 
-            try:
-                upload_process = subprocess.run(
-                    upload_log_cmd, 
-                    capture_output=True, 
-                    text=True, 
-                    check=False, 
-                    timeout=120  # 2 minute timeout for log upload
-                )
-                if upload_process.returncode == 0:
-                    print("INFO: Log file uploaded successfully.")
-                else:
-                    print(f"WARNING: Failed to upload log file '{log_file_path.name}'. Rclone exit code: {upload_process.returncode}", file=sys.stderr)
-                    if upload_process.stdout and upload_process.returncode !=0 : # Show stdout only on error for brevity
-                        print(f"Rclone stdout (log upload):\n{upload_process.stdout.strip()}", file=sys.stderr)
-                    if upload_process.stderr: 
-                        print(f"Rclone stderr (log upload):\n{upload_process.stderr.strip()}", file=sys.stderr)
-            except subprocess.TimeoutExpired:
-                 print(f"WARNING: Timeout during log upload to {full_remote_log_dest}", file=sys.stderr)
-            except FileNotFoundError: # Should have been caught by main rclone call
-                print("ERROR: 'rclone' command not found for log upload.", file=sys.stderr)
-            except Exception as e_upload_generic:
-                 print(f"WARNING: An error occurred during log upload: {e_upload_generic}", file=sys.stderr)
-        elif effective_cfg.get('upload_logs_to_remote'): 
+            if effective_cfg.compress_log_uploads:
+                print(f"INFO: Uploading log file '{current_log_file_name}' (compressed) to "
+                      f"{full_remote_log_dest}{COMPRESSED_LOG_SUFFIX} in the background.")
+            else:
+                print(f"INFO: Uploading log file '{current_log_file_name}' to {full_remote_log_dest} in the background.")
+            _submit_log_upload(effective_cfg, use_rcd, rcd_flags, current_run_log_path_str,
+                               current_remote_name_for_log_upload, remote_log_upload_path_str,
+                               full_remote_log_dest, rclone_bin)
+        else: 
             # This case means upload_logs_to_remote was true, but path or remote was missing
-            print("WARNING: 'upload_logs_to_remote' is true but 'remote_log_upload_path' "
-                  "and/or 'remote_name' is not specified sufficiently in config; cannot upload log.", file=sys.stderr)
+            logger.warning("WARNING: 'upload_logs_to_remote' is true but 'remote_log_upload_path' "
+                           "and/or 'remote_name' is not specified sufficiently in config; cannot upload log.")
                
     print("=" * 70)
     
-    if exit_code in [0, 124, 130]: # Normal terminations for a chunk
-        return 0 
-    return exit_code # Propagate rclone's error code or script's own critical error code (1)
+    # Normal terminations for a chunk report 0; otherwise propagate rclone's error code
+    # or the script's own critical error code (1).
+    return ChunkResult(0 if exit_code in [0, 124, 130] else exit_code,
+                       rclone_exit=exit_code,
+                       job_complete=job_complete,
+                       bytes_transferred=bytes_transferred,
+                       elapsed_seconds=time.monotonic() - chunk_start_time)
 
 if __name__ == '__main__':
     # This section is for testing the module directly, which is less common once integrated.
@@ -0,0 +1,46 @@
+# tests/test_chunk_rclone.py
+"""Tests for chunk_rclone.py's command-line parsing, which mirrors argparse's behaviour."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chunk_rclone
+
+@pytest.mark.parametrize("argv", [["-h"], ["--help"], ["job.toml", "--help"]])
+def test_help_exits_0(argv, capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        chunk_rclone.parse_args(argv)
+    assert exc_info.value.code == 0
+    assert capsys.readouterr().out.startswith(chunk_rclone.USAGE)
+
+def test_no_arguments():
+    assert chunk_rclone.parse_args([]) == (None, False)
+
+@pytest.mark.parametrize("argv", [["--dry-run", "job.toml"], ["job.toml", "--dry-run"]])
+def test_dry_run_before_or_after_control_file(argv):
+    assert chunk_rclone.parse_args(argv) == ("job.toml", True)
+
+def test_unknown_option_exits_2(capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        chunk_rclone.parse_args(["job.toml", "--verbose"])
+    assert exc_info.value.code == 2
+    captured = capsys.readouterr()
+    assert captured.out == ""
+    assert captured.err.splitlines() == [chunk_rclone.USAGE,
+                                         "chunk_rclone.py: error: unrecognized arguments: --verbose"]
+
+def test_second_positional_exits_2(capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        chunk_rclone.parse_args(["job.toml", "other.toml", "--dry-run"])
+    assert exc_info.value.code == 2
+    assert capsys.readouterr().err.splitlines() == [chunk_rclone.USAGE,
+                                                    "chunk_rclone.py: error: unrecognized arguments: other.toml"]
+
+def test_dash_is_a_control_file():
+    assert chunk_rclone.parse_args(["-"]) == ("-", False)
+
+# end of tests/test_chunk_rclone.py
@@ -0,0 +1,115 @@
+# tests/test_config_handler.py
+"""Tests for modules/config_handler.py: merging config.toml with a control file and validating the result."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import config_handler
+
+BASE_TOML = """
+[rclone_paths]
+remote_name = "base_remote"
+source_path = "base/src"
+destination_parent_path = "base/dst"
+backup_folder_name = "base_backup"
+
+[rclone_options]
+flags = ["-v", "--transfers", "2"]
+
+[chunking]
+run_duration_seconds = 3600
+grace_seconds = 45
+
+[logging]
+log_dir = "base_logs"
+"""
+
+@pytest.fixture(autouse=True)
+def isolated_cwd(tmp_path, monkeypatch):
+    """Runs each test in an empty directory, without the on-disk settings cache."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("RCLONE_CHUNK_NOCACHE", "1")
+    config_handler._config_paths.cache_clear() # Computed once per process from the working directory
+    yield tmp_path
+    config_handler._config_paths.cache_clear()
+
+def test_section_override_keeps_other_base_keys():
+    control = """
+[chunking]
+run_duration_seconds = 60
+"""
+    settings = config_handler.load_effective_config(base_source=BASE_TOML, control_source=control)
+    assert settings.run_duration_seconds == 60
+    assert settings.grace_seconds == 45 # Still from the base [chunking] section
+    assert settings.remote_name == "base_remote"
+    assert settings.full_destination_rclone_path == "base_remote:base/dst/base_backup"
+
+def test_non_table_value_replaces_base_value_entirely():
+    control = """
+[rclone_options]
+flags = ["-vv"]
+"""
+    settings = config_handler.load_effective_config(base_source=BASE_TOML, control_source=control)
+    assert settings.rclone_flags == ["-vv"]
+
+def test_top_level_value_overrides_base_value():
+    base = 'run_description = "Base run"\n' + BASE_TOML
+    control = 'run_description = "Control run"\n'
+    settings = config_handler.load_effective_config(base_source=base, control_source=control)
+    assert settings.run_description == "Control run"
+    assert settings.log_dir == "base_logs"
+
+def test_empty_control_file_changes_nothing():
+    settings = config_handler.load_effective_config(base_source=BASE_TOML, control_source="# Only a comment\n\n")
+    assert settings.run_duration_seconds == 3600
+    assert settings.rclone_flags == ["-v", "--transfers", "2"]
+    assert settings.state_dir == os.path.join("rclone_chunk_state", "base_backup")
+
+def test_control_file_loaded_from_working_directory(isolated_cwd):
+    (isolated_cwd / "config.toml").write_text(BASE_TOML, encoding="utf-8")
+    (isolated_cwd / "job.toml").write_text('[rclone_paths]\nbackup_folder_name = "job_backup"\n', encoding="utf-8")
+    settings = config_handler.load_effective_config("job.toml")
+    assert settings.backup_folder_name == "job_backup"
+    assert settings.source_rclone_path_on_remote == "base/src"
+
+def test_missing_path_keys_are_named(capsys):
+    base = """
+[rclone_paths]
+remote_name = "base_remote"
+destination_parent_path = ""
+
+[chunking]
+run_duration_seconds = 3600
+"""
+    with pytest.raises(SystemExit) as exc_info:
+        config_handler.load_effective_config(base_source=base, control_source="")
+    assert exc_info.value.code == 1
+    err = capsys.readouterr().err
+    assert "Missing or empty: 'source_path', 'backup_folder_name'" in err
+    assert "'destination_parent_path'" not in err.split("Missing or empty:")[1] # "" is a valid destination
+
+def test_parse_error_exits_with_code_1(capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        config_handler.load_effective_config(base_source=BASE_TOML, control_source="[chunking\nrun_duration_seconds = 1\n")
+    assert exc_info.value.code == 1
+    err = capsys.readouterr().err
+    assert "ERROR: Could not parse control file '<control_source>'" in err
+    assert "File begins with: '[chunking" in err
+
+def test_info_lines_written_once_before_error(capsys, monkeypatch):
+    monkeypatch.setattr(config_handler, "_VERBOSE", True)
+    with pytest.raises(SystemExit):
+        config_handler.load_effective_config(base_source=BASE_TOML, control_source="not toml = \n")
+    assert capsys.readouterr().out.count("INFO: Loaded base configuration from '<base_source>'") == 1
+
+def test_invalid_integer_setting_exits_with_code_1(capsys):
+    with pytest.raises(SystemExit) as exc_info:
+        config_handler.load_effective_config(base_source=BASE_TOML, control_source="[chunking]\nparallel_workers = 0\n")
+    assert exc_info.value.code == 1
+    assert "Invalid 'parallel_workers' (0)" in capsys.readouterr().err
+
+# end of tests/test_config_handler.py
@@ -0,0 +1,81 @@
+# tests/test_rclone_exec.py
+"""Tests for modules/rclone_exec.py: handing out '--files-from-raw' batches from files.lst."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules import rclone_exec
+
+FILE_NAMES = [f"dir/file_{index:02d}.txt" for index in range(5)] # 16 bytes per line with its newline
+
+def _write_files_list(state_dir, names=FILE_NAMES):
+    (state_dir / rclone_exec.FILES_LIST_FILENAME).write_text("".join(f"{name}\n" for name in names), encoding="utf-8")
+
+def _next_batches(state_dir, batch_size=2, batch_count=1):
+    # files.lst already exists, so rclone is never run to list the source.
+    return rclone_exec._next_files_from_batches(state_dir, batch_size, batch_count, "remote:src", [],
+                                                rclone_bin="/nonexistent/rclone")
+
+def _saved_offset(state_dir):
+    return int((state_dir / rclone_exec.FILES_LIST_POS_FILENAME).read_text(encoding="ascii"))
+
+def test_successive_batches_advance_offset_by_bytes(tmp_path):
+    _write_files_list(tmp_path)
+
+    (batch_path,) = _next_batches(tmp_path)
+    assert batch_path.read_text(encoding="utf-8").splitlines() == FILE_NAMES[:2]
+    assert _saved_offset(tmp_path) == 32
+    batch_path.unlink() # Copied successfully
+
+    (batch_path,) = _next_batches(tmp_path)
+    assert batch_path.read_text(encoding="utf-8").splitlines() == FILE_NAMES[2:4]
+    assert _saved_offset(tmp_path) == 64
+    # files.lst itself is left unchanged
+    assert (tmp_path / rclone_exec.FILES_LIST_FILENAME).read_text(encoding="utf-8").splitlines() == FILE_NAMES
+
+def test_parallel_batches_take_consecutive_lines(tmp_path):
+    _write_files_list(tmp_path)
+    batch_paths = _next_batches(tmp_path, batch_size=2, batch_count=2)
+    assert [path.name for path in batch_paths] == ["batch.lst", "batch_1.lst"]
+    assert batch_paths[1].read_text(encoding="utf-8").splitlines() == FILE_NAMES[2:4]
+    assert _saved_offset(tmp_path) == 64
+
+def test_leftover_batch_is_reused_before_new_lines(tmp_path):
+    _write_files_list(tmp_path)
+    (first_batch_path,) = _next_batches(tmp_path)
+    # The chunk did not complete, so the batch file is left behind.
+    (batch_path,) = _next_batches(tmp_path)
+    assert batch_path == first_batch_path
+    assert batch_path.read_text(encoding="utf-8").splitlines() == FILE_NAMES[:2]
+    assert _saved_offset(tmp_path) == 32
+
+    # With a second worker, the leftover batch comes first and only one new batch is made.
+    batch_paths = _next_batches(tmp_path, batch_count=2)
+    assert batch_paths[0] == first_batch_path
+    assert batch_paths[1].read_text(encoding="utf-8").splitlines() == FILE_NAMES[2:4]
+    assert _saved_offset(tmp_path) == 64
+
+def test_everything_handed_out(tmp_path):
+    _write_files_list(tmp_path)
+    files_list_size = (tmp_path / rclone_exec.FILES_LIST_FILENAME).stat().st_size
+    handed_out = []
+    while True:
+        batch_paths = _next_batches(tmp_path)
+        if not batch_paths:
+            break
+        handed_out += batch_paths[0].read_text(encoding="utf-8").splitlines()
+        batch_paths[0].unlink()
+
+    assert handed_out == FILE_NAMES
+    assert _saved_offset(tmp_path) == files_list_size
+    assert rclone_exec._files_list_done(tmp_path)
+    assert _next_batches(tmp_path) == []
+
+def test_files_list_done_before_listing(tmp_path):
+    assert not rclone_exec._files_list_done(tmp_path)
+    _write_files_list(tmp_path)
+    assert not rclone_exec._files_list_done(tmp_path)
+
+# end of tests/test_rclone_exec.py